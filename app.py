@@ -10,7 +10,7 @@ project_path = re.sub(
 os.chdir(project_path)
 st.session_state["project_path"] = project_path
 sys.path.append(project_path)
-from data import load_bankroll, prepare_bets_data
+from data_access import get_many
 
 if "logged_in" not in st.session_state:
     st.session_state.logged_in = False
@@ -19,16 +19,6 @@ if "logged_in" not in st.session_state:
 # Ensure a username key exists in session state
 if "username" not in st.session_state:
     st.session_state.username = ""
-    # Cache bankroll once per user as well
-if (
-    "bankroll_cached" not in st.session_state
-    or st.session_state.get("bankroll_cached_user_id") != st.session_state.ID_USER
-):
-    try:
-        st.session_state["bankroll_cached"] = load_bankroll(st.session_state.ID_USER)
-        st.session_state["bankroll_cached_user_id"] = st.session_state.ID_USER
-    except Exception:
-        st.session_state["bankroll_cached"] = None
 
 
 def logout():
@@ -36,8 +26,6 @@ def logout():
     st.session_state.username = ""
     st.session_state.ID_USER = None
     st.session_state.bankroll = None
-    # clear cached in-play badge when logging out
-    st.session_state.pop("cached_total_inplay", None)
     st.rerun()
 
 
@@ -64,23 +52,18 @@ data_explorer_page = st.Page(
 )
 
 if st.session_state.logged_in:
-    # compute in-play count to show next to the menu label, but cache it so it doesn't update on every rerun
-    cached = st.session_state.get("cached_total_inplay", None)
-    if cached is None:
-        try:
-            bets_data = prepare_bets_data(st.session_state["ID_USER"], finished=False)
-            cached = len(bets_data) if bets_data is not None else 0
-        except Exception:
-            cached = 0
-        st.session_state["cached_total_inplay"] = cached
-
-    total_inplay = st.session_state.get("cached_total_inplay", 0)
+    # bankroll and in-play count come from the shared data cache (see data_access),
+    # loaded in one parallel batch; a failed dataset falls back to its default
+    datasets = get_many(
+        st.session_state["ID_USER"], ["bankroll", "inplay_summary"], errors={}
+    )
+    bankroll = datasets.get("bankroll")
+    # cheap aggregated COUNT query, cached with a short TTL
+    total_inplay = datasets.get("inplay_summary", {}).get("n_bets", 0)
 
     pg = st.navigation(
         {
-            f"{st.session_state.username} ({str(st.session_state.bankroll_cached)}€)": [
-                logout_page
-            ],
+            f"{st.session_state.username} ({str(bankroll)}€)": [logout_page],
             "Reports": [
                 dashboard,
                 future_matchs_page,
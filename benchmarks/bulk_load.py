@@ -0,0 +1,94 @@
+"""
+Compares the db_utils bulk insert methods on a scratch table:
+
+    python benchmarks/bulk_load.py --schema TeNNet --rows 10000 100000 1000000
+
+load_data needs local_infile = true in the [db_bulk_load] secrets and on the
+MySQL server. The scratch table is dropped at the end.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+project_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + "/"
+st.session_state["project_path"] = project_path
+sys.path.append(project_path)
+from db_utils.db_utils import create_sql_table, drop_table, read_sql_query
+
+TABLE = "_bench_bulk_load"
+
+
+def make_frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Synthetic frame with the column kinds of the TeNNet tables.
+    """
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "ID_MATCH": [f"M{i:09d}" for i in range(n_rows)],
+            "ID_USER": rng.integers(1, 50, n_rows),
+            "winner_name": rng.choice(
+                ["Alcaraz C.", "Sinner J.", "O'Connell C."], n_rows
+            ),
+            "surface": rng.choice(["hard", "clay", "grass"], n_rows),
+            "odds": rng.uniform(1.01, 10, n_rows).round(2),
+            "stake": rng.uniform(1, 100, n_rows).round(2),
+            "tourney_date": pd.Timestamp("2026-01-01")
+            + pd.to_timedelta(rng.integers(0, 3600 * 24 * 300, n_rows), unit="s"),
+        }
+    )
+    df.loc[df.sample(frac=0.05, random_state=seed).index, "odds"] = np.nan
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--schema", default="TeNNet")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument(
+        "--methods", nargs="+", default=["to_sql", "executemany", "load_data"]
+    )
+    parser.add_argument("--output", help="JSON-lines file receiving the results")
+    args = parser.parse_args()
+    logging.getLogger("db_utils").setLevel(logging.ERROR)
+
+    results = []
+    for n_rows in args.rows:
+        df = make_frame(n_rows)
+        for method in args.methods:
+            start = time.perf_counter()
+            try:
+                create_sql_table(args.schema, TABLE, df, method=method)
+                elapsed = time.perf_counter() - start
+                count = read_sql_query(
+                    args.schema, f"SELECT COUNT(*) AS n FROM {TABLE}"
+                )
+                result = {
+                    "rows": n_rows,
+                    "method": method,
+                    "seconds": round(elapsed, 3),
+                    "rows_per_s": round(n_rows / elapsed),
+                    "loaded": int(count["n"].iloc[0]),
+                }
+            except Exception as e:  # noqa: BLE001 - reported in the results
+                result = {"rows": n_rows, "method": method, "error": str(e)}
+            print(json.dumps(result))
+            results.append(result)
+    drop_table(args.schema, TABLE)
+
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+Times the data.py bet preparation pipeline, stage by stage, on synthetic bets
+from db_utils.local_backend:
+
+    python benchmarks/data_pipeline.py --rows 1000 10000 100000 1000000 \\
+        --output benchmarks/results/$(git rev-parse --short HEAD).json
+    python benchmarks/data_pipeline.py --compare benchmarks/results/<base>.json
+
+Every stage reports its best and median time over --repeat runs and its peak
+Python memory (tracemalloc, measured in a separate run). The load_bets stage
+reads from a scratch SQLite database generated in a temporary directory, so
+no MySQL server is needed. With --compare, stages slower than the baseline by
+more than --threshold are listed and the exit code is 1.
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+project_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + "/"
+st.session_state["project_path"] = project_path
+sys.path.append(project_path)
+import data
+from db_utils import db_utils, local_backend
+
+STAGES = [
+    "load_bets",
+    "prepare_settled",
+    "prepare_inplay",
+    "score_is_void",
+    "group_agg",
+    "future_matchs",
+    "opportunities",
+]
+# generated data ends on a fixed date so runs are comparable
+END_DATE = "2026-06-01"
+BETS_PER_MATCH = 2
+
+
+def make_tables(n_bets: int, seed: int = 0) -> dict:
+    """
+    Generated tables of a single user with about n_bets settled bets.
+    """
+    return local_backend.generate(
+        n_users=1,
+        years=1,
+        matches_per_year=max(n_bets // BETS_PER_MATCH, 10),
+        bets_per_match=BETS_PER_MATCH,
+        future_days=0,
+        seed=seed,
+        end=END_DATE,
+    )
+
+
+def _match_frame(tables: dict) -> pd.DataFrame:
+    """
+    The three match tables stacked like the UNION branches of data._bets_query.
+    """
+    frames = []
+    for table, _, _, _, compet in data.MATCH_TABLES:
+        frame = tables["TeNNet"][table]
+        if table == "double_matchs":
+            frame = frame.assign(
+                winner_name=frame["winner_name1"] + "/" + frame["winner_name2"],
+                loser_name=frame["loser_name1"] + "/" + frame["loser_name2"],
+            )
+        frames.append(
+            frame.assign(doubles=int(table == "double_matchs"), compet=compet)
+        )
+    columns = [
+        "ID_MATCH",
+        "tourney_name",
+        "tourney_level",
+        "winner_name",
+        "loser_name",
+        "round",
+        "surface",
+        "match_settled",
+        "score",
+        "tourney_date",
+        "doubles",
+        "compet",
+    ]
+    return pd.concat([frame[columns] for frame in frames], ignore_index=True)
+
+
+def bets_frame(tables: dict, n_bets: int) -> pd.DataFrame:
+    """
+    Frame shaped like the load_bets result, built without a database.
+    """
+    matchs = _match_frame(tables).merge(tables["TeNNet"]["predictions"], on="ID_MATCH")
+    bets = tables["TeNNet"]["Bet"].head(n_bets).merge(matchs, on="ID_MATCH")
+    return data._sort_by_date(db_utils.compact_frame(bets, data.BETS_DTYPES))
+
+
+def future_frame(tables: dict) -> pd.DataFrame:
+    """
+    Every generated match shaped like the FUTURE_MATCHS_QUERY result.
+    """
+    odds = tables["TeNNet"]["odds"].rename(
+        columns={"id": "ID_MATCH", "liens": "odds_lien"}
+    )
+    odds = odds.rename(columns={"MaxW": "max_odds1", "MaxL": "max_odds2"})
+    matchs = _match_frame(tables).drop(columns=["match_settled", "score"])
+    return matchs.merge(tables["TeNNet"]["predictions"], on="ID_MATCH").merge(
+        odds, on="ID_MATCH"
+    )
+
+
+def _use_database(directory: str) -> None:
+    # engines are cached per schema, drop them so the next read opens directory
+    db_utils.DB_URL = f"sqlite:///{directory}/"
+    db_utils.get_engine.clear()
+
+
+def stage_tasks(tables: dict, n_bets: int) -> dict:
+    """
+    (setup, run) pairs per stage: setup builds fresh inputs outside of the
+    measured time, run is the measured call.
+    """
+    frame = bets_frame(tables, n_bets)
+    future = future_frame(tables)
+
+    def clear_void_cache():
+        data._score_is_void.cache_clear()
+        return (frame["score"],)
+
+    return {
+        "load_bets": (
+            lambda: (1,),
+            lambda user_id: data.load_bets(user_id, date_from=None),
+        ),
+        "prepare_settled": (
+            lambda: (frame.copy(),),
+            lambda df: data._prepare_bets(df, finished=True),
+        ),
+        "prepare_inplay": (
+            lambda: (frame.copy(),),
+            lambda df: data._prepare_bets(df, finished=False),
+        ),
+        "score_is_void": (clear_void_cache, data.scores_void_mask),
+        "group_agg": (
+            lambda: (data._prepare_bets(frame.copy(), finished=True),),
+            data._group_bets,
+        ),
+        "future_matchs": (
+            lambda: (future.copy(),),
+            lambda df: data._sort_by_date(
+                db_utils.compact_frame(df, data.FUTURE_MATCHS_DTYPES)
+            ),
+        ),
+        # rows / 2 upcoming matches, as returned by load_future_matchs
+        "opportunities": (
+            lambda: (
+                data._sort_by_date(
+                    db_utils.compact_frame(future.copy(), data.FUTURE_MATCHS_DTYPES)
+                ),
+            ),
+            data.compute_opportunities,
+        ),
+    }
+
+
+def measure(setup, run, repeat: int) -> dict:
+    """
+    Best and median wall time over repeat runs, then the peak memory of one
+    more run.
+    """
+    times = []
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        out_rows = len(run(*args))
+        times.append(time.perf_counter() - start)
+        del args
+    gc.collect()
+    args = setup()
+    tracemalloc.start()
+    run(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "out_rows": out_rows,
+        "best_s": round(min(times), 5),
+        "median_s": round(statistics.median(times), 5),
+        "peak_mb": round(peak / 1024**2, 2),
+    }
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=project_path,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: list, baseline_path: str, threshold: float) -> list:
+    """
+    Prints the time ratio of every (stage, rows) against a baseline run and
+    returns the regressions.
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    before = {(r["stage"], r["rows"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        base = before.get((result["stage"], result["rows"]))
+        if base is None or "best_s" not in base or "best_s" not in result:
+            continue
+        ratio = result["best_s"] / max(base["best_s"], 1e-9)
+        flag = ratio > 1 + threshold
+        print(
+            f"{result['stage']:>16} {result['rows']:>9}: "
+            f"{base['best_s']:.4f}s -> {result['best_s']:.4f}s (x{ratio:.2f})"
+            + ("  REGRESSION" if flag else "")
+        )
+        if flag:
+            regressions.append({**result, "baseline_s": base["best_s"]})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON file receiving the run")
+    parser.add_argument("--compare", help="JSON file of a previous run")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+    logging.getLogger("db_utils").setLevel(logging.ERROR)
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for n_rows in args.rows:
+            tables = make_tables(n_rows, args.seed)
+            if "load_bets" in args.stages:
+                local_backend.write_database(directory, tables)
+                _use_database(directory)
+            tasks = stage_tasks(tables, n_rows)
+            del tables
+            gc.collect()
+            for stage in args.stages:
+                try:
+                    result = {
+                        "stage": stage,
+                        "rows": n_rows,
+                        **measure(*tasks[stage], args.repeat),
+                    }
+                except Exception as e:  # noqa: BLE001 - reported in the results
+                    result = {"stage": stage, "rows": n_rows, "error": str(e)}
+                print(json.dumps(result))
+                results.append(result)
+            db_utils.get_engine.clear()
+
+    run = {
+        "commit": _commit(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2)
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
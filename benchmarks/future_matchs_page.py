@@ -0,0 +1,100 @@
+"""
+Renders pages/future_matchs.py headless (streamlit AppTest) on a local
+database from db_utils.local_backend and reports the render time and the
+size of what is sent to the browser:
+
+    python benchmarks/future_matchs_page.py --directory /tmp/tennet_local
+
+The database is generated first when the directory has none. elements is
+the number of Streamlit elements of the page and delta_kb the size of their
+serialized protos, which is what the websocket deltas carry.
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+project_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + "/"
+st.session_state["project_path"] = project_path
+sys.path.append(project_path)
+from db_utils import local_backend
+
+PAGE = os.path.join(project_path, "pages", "future_matchs.py")
+
+
+def _nodes(node):
+    yield node
+    for child in getattr(node, "children", {}).values():
+        yield from _nodes(child)
+
+
+def payload(at: AppTest) -> dict:
+    """
+    Element count and serialized size of the last run of a page.
+    """
+    protos = [node.proto for node in _nodes(at._tree) if getattr(node, "proto", None)]
+    return {
+        "elements": len(protos),
+        "delta_kb": round(sum(proto.ByteSize() for proto in protos) / 1024, 1),
+        "markdown": len(at.markdown),
+        "expanders": len(at.expander),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--directory", required=True)
+    parser.add_argument("--matches-per-year", type=int, default=300_000)
+    parser.add_argument("--future-days", type=int, default=7)
+    parser.add_argument("--reruns", type=int, default=5)
+    parser.add_argument("--output", help="JSON-lines file receiving the results")
+    args = parser.parse_args()
+    logging.getLogger("db_utils").setLevel(logging.ERROR)
+
+    if not os.path.exists(os.path.join(args.directory, "TeNNet")):
+        frames = local_backend.generate(
+            n_users=1,
+            years=0.05,
+            matches_per_year=args.matches_per_year,
+            bets_per_match=0.1,
+            future_days=args.future_days,
+        )
+        local_backend.write_database(args.directory, frames)
+
+    at = AppTest.from_file(PAGE, default_timeout=600)
+    at.session_state["project_path"] = project_path
+    at.secrets["db_url"] = f"sqlite:///{os.path.abspath(args.directory)}/"
+    start = time.perf_counter()
+    at.run()
+    first_s = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+    reruns = []
+    for _ in range(args.reruns):
+        start = time.perf_counter()
+        at.run()
+        reruns.append(time.perf_counter() - start)
+
+    result = {
+        "first_run_s": round(first_s, 3),
+        "rerun_s": round(statistics.median(reruns), 3),
+        **payload(at),
+    }
+    print(json.dumps(result))
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
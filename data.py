@@ -2,57 +2,134 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import functools
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from sqlalchemy import bindparam, text
+from urllib.parse import quote_plus
 
 import sys
 
 sys.path.append(st.session_state["project_path"])
-from db_utils.db_utils import read_sql_query
+from db_utils import db_utils
+from db_utils.cache import LRUCache
+from db_utils.db_utils import aread_sql_query, read_sql_query
+
+logger = logging.getLogger("data")
 
 BDD = "TeNNet"
 MAX_PRED_BETABLE = 4
 MIN_PRED_BETABLE = 1.1
+# Minimum expected value (in %) of the best odds over the prediction to bet
+MIN_MARGE = 2
+# Settled bets older than this are not loaded by default
+BETS_START_DATE = "2026-01-01"
+
+SETTLED_FILTER = "match_settled in (1,2) and score != 'W/O'"
+INPLAY_FILTER = "not match_settled in (1,2)"
+STATUS_LABELS = {True: "Terminé", False: "En cours"}
+
+# Prepared bets are persisted per user so cold starts skip the full pipeline.
+# Bump the version whenever the prepared or grouped columns change.
+SNAPSHOT_DIR = os.path.join(st.session_state["project_path"], ".cache", "bets")
+SNAPSHOT_SCHEMA_VERSION = 4
+# In-memory snapshots: byte budget (bets_snapshot_max_mb in st.secrets) and
+# seconds the snapshot of an idle user is kept, the on-disk one stays
+BETS_SNAPSHOT_MAX_MB = 256
+BETS_SNAPSHOT_TTL = 3600
+
+# (table, winner expression, loser expression, doubles flag, competition)
+MATCH_TABLES = [
+    ("men_matchs", "winner_name", "loser_name", "'doubles' = TRUE", "atp"),
+    ("women_matchs", "winner_name", "loser_name", "'doubles' = TRUE", "wta"),
+    (
+        "double_matchs",
+        "concat(winner_name1,'/',winner_name2)",
+        "concat(loser_name1,'/',loser_name2)",
+        "'doubles' = FALSE",
+        "doubles",
+    ),
+]
+
+# Compact decoding schemas (see db_utils.compact_frame): repeated labels are
+# read as categoricals, numerics are downcast
+LABEL_COLUMNS = ["tourney_name", "tourney_level", "round", "surface", "compet"]
+# Money and price columns stay float64 even when float32 would hold them
+# exactly, so stakes, gains and EV are computed in double precision
+PRICE_DTYPES = {col: "float64" for col in ["winner_pred", "loser_pred"]}
+BETS_DTYPES = {
+    **{col: "category" for col in LABEL_COLUMNS + ["ID_MARKET", "type", "status"]},
+    **PRICE_DTYPES,
+    "stake": "float64",
+    "odds": "float64",
+}
+FUTURE_MATCHS_DTYPES = {
+    **{col: "category" for col in LABEL_COLUMNS},
+    **PRICE_DTYPES,
+    "max_odds1": "float64",
+    "max_odds2": "float64",
+}
+# Seconds the future matches query result is shared between sessions
+FUTURE_MATCHS_CACHE_TTL = 300
+
+
+BANKROLL_QUERY = """SELECT bankroll FROM FootNet.Users WHERE ID_USER = :user_id"""
+
+
+def _bankroll_value(bankroll_data: pd.DataFrame) -> int:
+    if bankroll_data.empty:
+        return 0
+    return int(bankroll_data["bankroll"].values[0])
 
 
 def load_bankroll(user_id: int):
     """
     Loads the bankroll for a given user from the database.
     """
-    query_bankroll = f"""SELECT bankroll FROM FootNet.Users WHERE ID_USER = {user_id}"""
-    bankroll_data = read_sql_query(BDD, query_bankroll)
-    if not bankroll_data.empty:
-        st.session_state["bankroll"] = int(bankroll_data["bankroll"].values[0])
-    else:
-        st.session_state["bankroll"] = 0
+    bankroll_data = read_sql_query(
+        BDD, BANKROLL_QUERY, params={"user_id": int(user_id)}
+    )
+    st.session_state["bankroll"] = _bankroll_value(bankroll_data)
     return st.session_state["bankroll"]
 
 
-def load_bets(user_id: int):
+async def aload_bankroll(user_id: int) -> int:
     """
-    Loads the bets_data for a given user from the database.
+    Async counterpart of load_bankroll. It only returns the bankroll:
+    st.session_state is not available on the db_utils event loop.
     """
-    query_bets = """SELECT b.*,
-                            tourney_name,
-                            tourney_level,
-                            winner_name,
-                            loser_name,
-                            round,
-                            surface,
-                            match_settled,
-                            score,
-                            tourney_date,
-                            winner_pred,
-                            loser_pred,
-                            'doubles' = TRUE as doubles,
-                            'atp' as compet
-                                    FROM Bet b join men_matchs m on (b.ID_MATCH = m.ID_MATCH) 
-                                        right join predictions p on (m.ID_MATCH = p.ID_MATCH)
-                                        WHERE match_settled in (1,2) and score != 'W/O'
-                    UNION
-                        SELECT b.*,
+    bankroll_data = await aread_sql_query(
+        BDD, BANKROLL_QUERY, params={"user_id": int(user_id)}
+    )
+    return _bankroll_value(bankroll_data)
+
+
+def _bets_query(
+    settled_filter: str, date_from=None, date_to=None, extra_predicates=()
+) -> tuple[str, dict]:
+    """
+    Builds the Bet UNION over the three match tables for a single user.
+    Every predicate is pushed into each branch so MySQL can use its indexes.
+    """
+    predicates = ["b.ID_USER = :user_id", f"({settled_filter})", *extra_predicates]
+    params = {}
+    if date_from is not None:
+        predicates.append("tourney_date >= :date_from")
+        params["date_from"] = str(date_from)
+    if date_to is not None:
+        predicates.append("tourney_date < :date_to")
+        params["date_to"] = str(date_to)
+    where = " and ".join(predicates)
+    branches = [
+        f"""SELECT b.*,
                             tourney_name,
                             tourney_level,
-                            winner_name,
-                            loser_name,
+                            {winner_name} as winner_name,
+                            {loser_name} as loser_name,
                             round,
                             surface,
                             match_settled,
@@ -60,36 +137,88 @@ def load_bets(user_id: int):
                             tourney_date,
                             winner_pred,
                             loser_pred,
-                            'doubles' = TRUE as doubles,
-                            'wta' as compet
-                                    FROM  Bet b join women_matchs m on (b.ID_MATCH = m.ID_MATCH)
-                                        right join predictions p on (m.ID_MATCH = p.ID_MATCH)
-                                        WHERE  match_settled in (1,2) and score != 'W/O'
-                    UNION
-                        SELECT b.*, 
-                                tourney_name,
-                                tourney_level,
-                                concat(winner_name1,'/',winner_name2) as winner_name,
-                                concat(loser_name1,'/',loser_name2)  as loser_name,
-                                round,
-                                surface,
-                                match_settled, 
-                                score,
-                                tourney_date, 
-                                winner_pred,
-                                loser_pred,
-                                'doubles' = FALSE as doubles  ,
-                                'doubles' as compet
-                                    FROM Bet b join double_matchs m  on (b.ID_MATCH = m.ID_MATCH) 
+                            {doubles} as doubles,
+                            '{compet}' as compet
+                                    FROM Bet b join {table} m on (b.ID_MATCH = m.ID_MATCH)
                                         right join predictions p on (m.ID_MATCH = p.ID_MATCH)
-                                        WHERE match_settled in (1,2) and score != 'W/O'"""
-    bets_data = read_sql_query(BDD, query_bets)
-    bets_data = bets_data[
-        (bets_data["ID_USER"] == user_id) & (bets_data["tourney_date"] >= "2026-01-01")
+                                        WHERE {where}"""
+        for table, winner_name, loser_name, doubles, compet in MATCH_TABLES
     ]
-    bets_data.sort_values(by="tourney_date", ascending=True, inplace=True)
-    bets_data.reset_index(drop=True, inplace=True)
-    return bets_data
+    return "\n                    UNION\n                        ".join(
+        branches
+    ), params
+
+
+def _all_bets_filter(date_from=None, date_to=None) -> tuple[str, dict]:
+    """
+    Settled-or-in-play filter where the date window only bounds settled
+    bets, as with load_bets and load_inplay_bets.
+    """
+    predicates = [SETTLED_FILTER]
+    params = {}
+    if date_from is not None:
+        predicates.append("tourney_date >= :date_from")
+        params["date_from"] = str(date_from)
+    if date_to is not None:
+        predicates.append("tourney_date < :date_to")
+        params["date_to"] = str(date_to)
+    return f"({' and '.join(predicates)}) or {INPLAY_FILTER}", params
+
+
+def _sort_by_date(data: pd.DataFrame) -> pd.DataFrame:
+    data.sort_values(by="tourney_date", ascending=True, inplace=True)
+    data.reset_index(drop=True, inplace=True)
+    return data
+
+
+def load_bets(user_id: int, date_from=BETS_START_DATE, date_to=None):
+    """
+    Loads the settled bets_data for a given user from the database.
+    date_from is inclusive and date_to exclusive; None disables the bound.
+    """
+    query_bets, params = _bets_query(SETTLED_FILTER, date_from, date_to)
+    params["user_id"] = int(user_id)
+    bets_data = read_sql_query(BDD, query_bets, params=params, dtypes=BETS_DTYPES)
+    return _sort_by_date(bets_data)
+
+
+async def aload_bets(user_id: int, date_from=BETS_START_DATE, date_to=None):
+    """
+    Async counterpart of load_bets.
+    """
+    query_bets, params = _bets_query(SETTLED_FILTER, date_from, date_to)
+    params["user_id"] = int(user_id)
+    bets_data = await aread_sql_query(
+        BDD, query_bets, params=params, dtypes=BETS_DTYPES
+    )
+    return _sort_by_date(bets_data)
+
+
+def _empty_bets_frame() -> pd.DataFrame:
+    """
+    Returns an empty grouped bets frame with the expected schema.
+    """
+    cols = [
+        "ID_MATCH",
+        "Match",
+        "Date",
+        "Compétition",
+        "Level",
+        "Round",
+        "Surface",
+        "Mise",
+        "Cote",
+        "Prédiction",
+        "Gains net",
+        "Marge attendue",
+    ]
+    empty_df = pd.DataFrame(columns=cols)
+    # Ensure numeric columns exist with float dtype
+    for num_col in ["Mise", "Cote", "Prédiction", "Gains net", "Marge attendue"]:
+        empty_df[num_col] = empty_df.get(num_col, pd.Series(dtype=float)).astype(float)
+    # Add cumulative column expected by prep_candle_data
+    empty_df["Cumulative Gains"] = empty_df["Gains net"].cumsum()
+    return empty_df
 
 
 def prepare_bets_data(user_id: int, finished: bool = True):
@@ -104,69 +233,61 @@ def prepare_bets_data(user_id: int, finished: bool = True):
 
     # Defensive: if no data returned, provide an empty dataframe with expected schema
     if bets_data is None or bets_data.empty:
-        cols = [
-            "ID_MATCH",
-            "Match",
-            "Date",
-            "Compétition",
-            "Level",
-            "Round",
-            "Surface",
-            "Mise",
-            "Cote",
-            "Prédiction",
-            "Gains net",
-            "Marge attendue",
-        ]
-        empty_df = pd.DataFrame(columns=cols)
-        # Ensure numeric columns exist with float dtype
-        for num_col in ["Mise", "Cote", "Prédiction", "Gains net", "Marge attendue"]:
-            empty_df[num_col] = empty_df.get(num_col, pd.Series(dtype=float)).astype(
-                float
-            )
-        # Add cumulative column expected by prep_candle_data
-        empty_df["Cumulative Gains"] = empty_df["Gains net"].cumsum()
-        return empty_df
+        return _empty_bets_frame()
+
+    prepared_bets = _prepare_bets(bets_data, finished)
+    return _group_bets(prepared_bets)
+
+
+def _prepare_bets(bets_data: pd.DataFrame, finished: bool | None) -> pd.DataFrame:
+    """
+    Computes the per-bet display columns (one row per Bet) and flags voided bets.
+    With finished=None the settled state of each bet is read from match_settled,
+    so settled and in-play bets can be prepared in one pass.
+    """
+    if finished is None:
+        settled = bets_data["match_settled"].isin([1, 2]).to_numpy()
+    else:
+        settled = np.full(len(bets_data), bool(finished))
+    won = (
+        (bets_data["match_settled"] == 1) & (bets_data["bet"] == 1)
+        | (bets_data["match_settled"] == 2) & (bets_data["bet"] == 0)
+    ).to_numpy()
 
     bets_data["Match"] = bets_data["winner_name"] + " - " + bets_data["loser_name"]
     bets_data["real_odds"] = (1 / (bets_data["odds"] - 1)) * 0.97 + 1
 
-    if finished:
-        bets_data["cote_pred"] = np.where(
-            (bets_data["match_settled"] == 1) & (bets_data["bet"] == 1)
-            | (bets_data["match_settled"] == 2) & (bets_data["bet"] == 0),
-            bets_data["winner_pred"],
-            bets_data["loser_pred"],
-        )
-        bets_data["player_bet"] = np.where(
-            bets_data["bet"] == 1, bets_data["winner_name"], bets_data["loser_name"]
-        )
-        bets_data["win"] = np.where(
-            (bets_data["match_settled"] == 1) & (bets_data["bet"] == 1)
-            | (bets_data["match_settled"] == 2) & (bets_data["bet"] == 0),
-            1,
-            0,
-        )
-        bets_data["net_gain"] = np.where(
+    # settled bets: prediction of the side that won if the bet won
+    bets_data["cote_pred"] = np.where(
+        settled,
+        np.where(won, bets_data["winner_pred"], bets_data["loser_pred"]),
+        np.where(
+            bets_data["bet"] == 1, bets_data["winner_pred"], bets_data["loser_pred"]
+        ),
+    )
+    bets_data["player_bet"] = np.where(
+        bets_data["bet"] == 1, bets_data["winner_name"], bets_data["loser_name"]
+    )
+    bets_data["win"] = np.where(settled & won, 1, 0)
+    bets_data["net_gain"] = np.where(
+        settled,
+        np.where(
             bets_data["win"] == 1,
             bets_data["real_odds"] * bets_data["stake"] - bets_data["stake"],
             -bets_data["stake"],
-        )
-        bets_data["net_unit"] = bets_data["net_gain"] / bets_data["stake"]
-    else:
-        bets_data["cote_pred"] = np.where(
-            bets_data["bet"] == 1, bets_data["winner_pred"], bets_data["loser_pred"]
-        )
-        bets_data["player_bet"] = np.where(
-            bets_data["bet"] == 1, bets_data["winner_name"], bets_data["loser_name"]
-        )
-        bets_data["net_gain"] = 0.0
-        bets_data["net_unit"] = 0.0
-        bets_data["score"] = ""
+        ),
+        0.0,
+    )
+    bets_data["net_unit"] = np.where(
+        settled, bets_data["net_gain"] / bets_data["stake"], 0.0
+    )
+    bets_data["score"] = bets_data["score"].where(settled, "")
+    bets_data["settled"] = settled
     bets_data["marge_unit"] = bets_data["real_odds"] / bets_data["cote_pred"] - 1
     bets_data["marge"] = bets_data["marge_unit"] * bets_data["stake"]
     prepared_bets = bets_data[
         [
+            "ID_BET",
             "ID_MATCH",
             "Match",
             "tourney_date",
@@ -181,9 +302,10 @@ def prepare_bets_data(user_id: int, finished: bool = True):
             "cote_pred",
             "net_gain",
             "marge",
+            "settled",
         ]
     ].copy()
-    prepared_bets["compet"] = prepared_bets["compet"].str.title()
+    prepared_bets["compet"] = _map_distinct(prepared_bets["compet"], str.title)
 
     # Extract time (Horaire) from tourney_date for display in match table
     try:
@@ -196,14 +318,13 @@ def prepare_bets_data(user_id: int, finished: bool = True):
 
     # Map surface names to French and normalize capitalization
     try:
-        prepared_bets["surface"] = prepared_bets["surface"].astype(str).str.title()
         surface_map = {
             "Hard": "Dur",
             "Grass": "Gazon",
             "Clay": "Terre battue",
         }
-        prepared_bets["surface"] = prepared_bets["surface"].map(
-            lambda v: surface_map.get(v, v)
+        prepared_bets["surface"] = _map_distinct(
+            prepared_bets["surface"], lambda v: surface_map.get(v.title(), v.title())
         )
     except Exception:
         pass
@@ -221,9 +342,8 @@ def prepare_bets_data(user_id: int, finished: bool = True):
             "RR": "Round Robin",
         }
         # Normalize and map; keep original value if not found
-        prepared_bets["round"] = prepared_bets["round"].astype(str).str.upper()
-        prepared_bets["round"] = prepared_bets["round"].map(
-            lambda r: round_map.get(r, r)
+        prepared_bets["round"] = _map_distinct(
+            prepared_bets["round"], lambda r: round_map.get(r.upper(), r.upper())
         )
     except Exception:
         pass
@@ -239,11 +359,9 @@ def prepare_bets_data(user_id: int, finished: bool = True):
             "P": "WTA 500",
             "PM": "WTA 1000",
         }
-        prepared_bets["tourney_level"] = (
-            prepared_bets["tourney_level"].astype(str).str.upper()
-        )
-        prepared_bets["tourney_level"] = prepared_bets["tourney_level"].map(
-            lambda lvl: level_map.get(lvl, lvl)
+        prepared_bets["tourney_level"] = _map_distinct(
+            prepared_bets["tourney_level"],
+            lambda lvl: level_map.get(lvl.upper(), lvl.upper()),
         )
     except Exception:
         pass
@@ -270,70 +388,121 @@ def prepare_bets_data(user_id: int, finished: bool = True):
         inplace=True,
     )
     # Flag matches with incomplete sets (voided) — they should not count in results.
-    import re
+    # In-play bets have no score yet, so they are never voided.
+    prepared_bets["voided"] = prepared_bets["settled"] & scores_void_mask(
+        prepared_bets["Score"]
+    )
+    return prepared_bets
 
-    set_re = re.compile(r"^(?P<a>\d+)-(?P<b>\d+)(?:\(\d+\))?$")
 
-    def _score_is_void(score):
-        try:
-            if not isinstance(score, str) or score.strip() == "":
-                return True
-            # normalize tokens and keep original tokens for set parsing
-            raw_tokens = score.strip().split()
-            tokens_upper = [t.upper().strip(".,") for t in raw_tokens]
-
-            # detect retirement/abandon markers (common variants)
-            retire_markers = (
-                "RET",
-                "RETIRE",
-                "RETIREE",
-                "RET.",
-                "ABD",
-                "ABANDON",
-                "RETIREMENT",
-            )
-            is_retirement = any(
-                any(marker in t for marker in retire_markers) for t in tokens_upper
-            )
-
-            # keep tokens that look like set scores (contain digits and a dash)
-            set_tokens = [t.rstrip(",") for t in raw_tokens if re.search(r"\d+-\d+", t)]
-
-            # if there are no set tokens, consider void unless retirement explicitly present with at least one numeric token
-            if not set_tokens:
-                return not is_retirement
-
-            # helper to check if a set looks completed
-            def _set_completed(t):
-                m = set_re.match(t)
-                if not m:
-                    return False
-                a = int(m.group("a"))
-                b = int(m.group("b"))
-                return a >= 6 or b >= 6 or "(" in t
-
-            # If the match ended with a retirement/abandon, only consider it valid if there is at least one completed set
-            if is_retirement:
-                any_completed = any(_set_completed(t) for t in set_tokens)
-                return not any_completed
-
-            # Otherwise, ensure every reported set looks completed (>=6 or includes tiebreak)
-            for t in set_tokens:
-                if not _set_completed(t):
-                    return True
-            return False
-        except Exception:
+def _map_distinct(values: pd.Series, func: callable) -> pd.Series:
+    """
+    Maps the string form of a column like values.astype(str).map(func), calling
+    func once per distinct value (cheap on categorical columns). The result is
+    an object column.
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    labels = np.array(
+        [func("None" if pd.isna(value) else str(value)) for value in uniques],
+        dtype=object,
+    )
+    return pd.Series(labels[codes], index=values.index, name=values.name)
+
+
+# Set score such as "6-4" or "7-6(5)"
+SET_SCORE_RE = re.compile(r"^(?P<a>\d+)-(?P<b>\d+)(?:\(\d+\))?$")
+SET_TOKEN_RE = re.compile(r"\d+-\d+")
+# Retirement/abandon markers (common variants)
+RETIRE_MARKERS = (
+    "RET",
+    "RETIRE",
+    "RETIREE",
+    "RET.",
+    "ABD",
+    "ABANDON",
+    "RETIREMENT",
+)
+
+
+def _set_completed(token: str) -> bool:
+    """
+    Checks if a set looks completed (>=6 games or includes a tiebreak).
+    """
+    m = SET_SCORE_RE.match(token)
+    if not m:
+        return False
+    a = int(m.group("a"))
+    b = int(m.group("b"))
+    return a >= 6 or b >= 6 or "(" in token
+
+
+@functools.lru_cache(maxsize=8192)
+def _score_is_void(score) -> bool:
+    """
+    Tells if a match score has incomplete sets, in which case the bet is voided.
+    """
+    try:
+        if not isinstance(score, str) or score.strip() == "":
             return True
+        # normalize tokens and keep original tokens for set parsing
+        raw_tokens = score.strip().split()
+        tokens_upper = [t.upper().strip(".,") for t in raw_tokens]
+
+        is_retirement = any(
+            any(marker in t for marker in RETIRE_MARKERS) for t in tokens_upper
+        )
+
+        # keep tokens that look like set scores (contain digits and a dash)
+        set_tokens = [t.rstrip(",") for t in raw_tokens if SET_TOKEN_RE.search(t)]
+
+        # if there are no set tokens, consider void unless retirement explicitly present with at least one numeric token
+        if not set_tokens:
+            return not is_retirement
+
+        # If the match ended with a retirement/abandon, only consider it valid if there is at least one completed set
+        if is_retirement:
+            any_completed = any(_set_completed(t) for t in set_tokens)
+            return not any_completed
+
+        # Otherwise, ensure every reported set looks completed (>=6 or includes tiebreak)
+        for t in set_tokens:
+            if not _set_completed(t):
+                return True
+        return False
+    except Exception:
+        return True
+
+
+def scores_void_mask(scores: pd.Series) -> pd.Series:
+    """
+    Flags voided scores like _score_is_void, parsing each distinct score only once.
+    """
+    codes, uniques = pd.factorize(scores)
+    uniques_void = np.fromiter(
+        (_score_is_void(score) for score in uniques), dtype=bool, count=len(uniques)
+    )
+    # missing scores (code -1) are void
+    mask = np.ones(len(codes), dtype=bool)
+    known = codes >= 0
+    mask[known] = uniques_void[codes[known]]
+    return pd.Series(mask, index=scores.index, name=scores.name)
+
 
-    prepared_bets["voided"] = prepared_bets["Score"].apply(_score_is_void)
-    print(prepared_bets[prepared_bets["ID_MATCH"] == "8tblVgJr"][["Score", "voided"]])
+GROUP_KEYS = ["ID_MATCH", "Match", "player_bet"]
+
+
+def _aggregate_bets(prepared_bets: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregates the valid per-bet rows into one row per (match, player beted).
+    """
     # Exclude voided matches from the grouped results
     valid_bets = prepared_bets[~prepared_bets["voided"]].copy()
+    # Stake-weighted odds as sum(Cote * Mise) / sum(Mise), so that every
+    # aggregation stays a built-in groupby reduction
+    valid_bets["Cote"] = valid_bets["Cote"] * valid_bets["Mise"]
 
     grouped_bets = (
-        valid_bets.groupby(
-            ["ID_MATCH", "Match", "player_bet"]
-        )  # use valid_bets instead of prepared_bets
+        valid_bets.groupby(GROUP_KEYS)  # use valid_bets instead of prepared_bets
         .agg(
             {
                 "Date": "first",
@@ -343,9 +512,7 @@ def prepare_bets_data(user_id: int, finished: bool = True):
                 "Surface": "first",
                 "Score": "first",
                 "Mise": "sum",
-                "Cote": lambda x: np.average(
-                    x, weights=valid_bets.loc[x.index, "Mise"]
-                ),
+                "Cote": "sum",
                 "Prédiction": "mean",
                 "Gains net": "sum",
                 "Marge attendue": "sum",
@@ -353,83 +520,472 @@ def prepare_bets_data(user_id: int, finished: bool = True):
         )
         .reset_index()
     )
-    grouped_bets["Cote"] = grouped_bets["Cote"].round(3)
+    grouped_bets["Cote"] = (grouped_bets["Cote"] / grouped_bets["Mise"]).round(3)
     grouped_bets["Prédiction"] = grouped_bets["Prédiction"].round(3)
     grouped_bets["Marge attendue"] = grouped_bets["Marge attendue"].round(2)
-    grouped_bets.sort_values(by="Date", ascending=True, inplace=True)
-    grouped_bets.reset_index(drop=True, inplace=True)
-    grouped_bets["Cumulative Gains"] = grouped_bets["Gains net"].cumsum()
-    # print(grouped_bets.dtypes)
+    return grouped_bets
+
+
+def _sort_grouped_bets(grouped_bets: pd.DataFrame) -> pd.DataFrame:
+    # Group keys break ties so a full and an incremental build keep the same order
+    grouped_bets = grouped_bets.sort_values(by=["Date"] + GROUP_KEYS, ascending=True)
+    return grouped_bets.reset_index(drop=True)
 
+
+def _group_bets(prepared_bets: pd.DataFrame) -> pd.DataFrame:
+    """
+    Groups the per-bet rows and adds the cumulative gains.
+    """
+    grouped_bets = _sort_grouped_bets(_aggregate_bets(prepared_bets))
+    grouped_bets["Cumulative Gains"] = grouped_bets["Gains net"].cumsum()
     return grouped_bets
 
 
-def load_inplay_bets(user_id: int):
+def load_all_bets(user_id: int, date_from=BETS_START_DATE, date_to=None):
     """
-    Loads the bets_data for a given user from the database.
+    Loads the settled and in-play bets of a user in a single query, with a
+    Statut column ("Terminé" / "En cours").
     """
-    query_bets = """SELECT b.*,
-                            tourney_name,
-                            tourney_level,
-                            winner_name,
-                            loser_name,
-                            round,
-                            surface,
-                            match_settled,
-                            tourney_date,
-                            winner_pred,
-                            loser_pred,
-                            'doubles' = TRUE as doubles,
-                            'atp' as compet
-                                    FROM Bet b join men_matchs m on (b.ID_MATCH = m.ID_MATCH) 
-                                        right join predictions p on (m.ID_MATCH = p.ID_MATCH)
-                                        WHERE not match_settled in (1,2)
-                    UNION
-                        SELECT b.*,
-                            tourney_name,
-                            tourney_level,
-                            winner_name,
-                            loser_name,
-                            round,
-                            surface,
-                            match_settled,
-                            tourney_date,
-                            winner_pred,
-                            loser_pred,
-                            'doubles' = TRUE as doubles,
-                            'wta' as compet
-                                    FROM  Bet b join women_matchs m on (b.ID_MATCH = m.ID_MATCH)
-                                        right join predictions p on (m.ID_MATCH = p.ID_MATCH)
-                                        WHERE  not match_settled in (1,2)
-                    UNION
-                        SELECT b.*, 
-                                tourney_name,
-                                tourney_level,
-                                concat(winner_name1,'/',winner_name2) as winner_name,
-                                concat(loser_name1,'/',loser_name2)  as loser_name,
-                                round,
-                                surface,
-                                match_settled, 
-                                tourney_date, 
-                                winner_pred,
-                                loser_pred,
-                                'doubles' = FALSE as doubles  ,
-                                'doubles' as compet
-                                    FROM Bet b join double_matchs m  on (b.ID_MATCH = m.ID_MATCH) 
-                                        right join predictions p on (m.ID_MATCH = p.ID_MATCH)
-                                        WHERE not match_settled in (1,2)"""
-    bets_data = read_sql_query(BDD, query_bets)
-    bets_data = bets_data[(bets_data["ID_USER"] == user_id)]
-    bets_data.sort_values(by="tourney_date", ascending=True, inplace=True)
-    bets_data.reset_index(drop=True, inplace=True)
-    return bets_data
+    all_bets_filter, params = _all_bets_filter(date_from, date_to)
+    query_bets, _ = _bets_query(all_bets_filter)
+    params["user_id"] = int(user_id)
+    bets_data = read_sql_query(BDD, query_bets, params=params, dtypes=BETS_DTYPES)
+    bets_data["Statut"] = np.where(
+        bets_data["match_settled"].isin([1, 2]),
+        STATUS_LABELS[True],
+        STATUS_LABELS[False],
+    )
+    return _sort_by_date(bets_data)
 
 
-def load_future_matchs():
+def _group_all_bets(prepared_bets: pd.DataFrame) -> pd.DataFrame:
     """
-    Loads the future matchs from the database.
+    Groups settled and in-play bets separately (cumulative gains only make
+    sense for settled ones) and stacks them with a Statut column.
+    """
+    frames = []
+    for settled, label in STATUS_LABELS.items():
+        part = prepared_bets[prepared_bets["settled"] == settled]
+        if not part.empty:
+            frames.append(_group_bets(part).assign(Statut=label))
+    if not frames:
+        return _empty_bets_frame().assign(Statut=pd.Series(dtype=object))
+    return pd.concat(frames, ignore_index=True)
+
+
+def prepare_all_bets(user_id: int, date_from=BETS_START_DATE) -> pd.DataFrame:
+    """
+    Settled and in-play grouped bets of a user from one query and one
+    preparation pass. Use split_bets to separate them.
+    """
+    bets_data = load_all_bets(user_id, date_from)
+    if bets_data.empty:
+        return _group_all_bets(pd.DataFrame(columns=["settled"]))
+    return _group_all_bets(_prepare_bets(bets_data, finished=None))
+
+
+def split_bets(all_bets: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Splits a prepare_all_bets / refresh_all_bets frame into (settled, in-play).
+    """
+    parts = []
+    for label in STATUS_LABELS.values():
+        part = all_bets[all_bets["Statut"] == label].drop(columns="Statut")
+        parts.append(_empty_bets_frame() if part.empty else part.reset_index(drop=True))
+    return parts[0], parts[1]
+
+
+@st.cache_resource(show_spinner=False)
+def _bets_snapshots() -> dict:
+    """
+    Process-wide store of the per-user snapshots kept by refresh_bets_data,
+    evicted least recently used first beyond the byte budget.
+    """
+    max_mb = st.secrets.get("bets_snapshot_max_mb", BETS_SNAPSHOT_MAX_MB)
+    users = LRUCache(max_bytes=int(max_mb) * 1024 * 1024, default_ttl=BETS_SNAPSHOT_TTL)
+    return {"lock": threading.Lock(), "locks": {}, "users": users}
+
+
+def _snapshot_lock(user_id: int) -> threading.Lock:
+    store = _bets_snapshots()
+    with store["lock"]:
+        return store["locks"].setdefault(user_id, threading.Lock())
+
+
+def drop_bets_snapshot(user_id: int) -> bool:
+    """
+    Drops the in-memory snapshot of a user, the next refresh starts from the
+    on-disk one.
+    """
+    return _bets_snapshots()["users"].invalidate(user_id)
+
+
+def load_bets_delta(
+    user_id: int, last_id: int = 0, pending_ids=(), date_from=BETS_START_DATE
+):
+    """
+    Loads the bets of a user above the last_id watermark plus the pending_ids
+    bets, whether they are settled or still in play. Bets that match neither
+    yet (no settled state or no score) and walkovers are loaded too, see
+    _delta_status.
+    """
+    all_bets_filter, filter_params = _all_bets_filter(date_from)
+    query_bets, params = _bets_query(
+        f"({all_bets_filter}) or match_settled is null or score is null"
+        " or score = 'W/O'",
+        extra_predicates=["(b.ID_BET > :last_id or b.ID_BET in :pending_ids)"],
+    )
+    params.update(filter_params)
+    query_bets = text(query_bets).bindparams(bindparam("pending_ids", expanding=True))
+    params["user_id"] = int(user_id)
+    params["last_id"] = int(last_id)
+    params["pending_ids"] = [int(i) for i in pending_ids]
+    bets_data = read_sql_query(BDD, query_bets, params=params, dtypes=BETS_DTYPES)
+    return _sort_by_date(bets_data)
+
+
+def _delta_status(delta: pd.DataFrame) -> tuple[pd.Series, pd.Series, pd.Series]:
+    """
+    (settled, inplay, pending) masks of a load_bets_delta frame, settled and
+    inplay matching SETTLED_FILTER and INPLAY_FILTER. Pending bets are the
+    in-play ones plus the undecided ones (e.g. a match marked settled before
+    its score is written), which are refetched until they are settled or a
+    walkover (voided).
+    """
+    finished = delta["match_settled"].isin([1, 2])
+    walkover = delta["score"].astype(object) == "W/O"
+    settled = finished & delta["score"].notna() & ~walkover
+    inplay = ~finished & delta["match_settled"].notna()
+    return settled, inplay, ~settled & ~(finished & walkover)
+
+
+def _merge_bets_delta(snapshot: dict, delta: pd.DataFrame) -> dict:
+    """
+    Merges freshly loaded bets into a snapshot, regrouping only the
+    (ID_MATCH, Match, player_bet) groups they touch. The delta holds every
+    in-play bet of the user, so the in-play groups are rebuilt from it.
+    """
+    snapshot = dict(snapshot)
+    snapshot["inplay"] = _empty_bets_frame()
+    if delta.empty:
+        # pending bets that are no longer returned were removed
+        snapshot["pending_ids"] = []
+        return snapshot
+
+    settled, inplay, pending = _delta_status(delta)
+    snapshot["last_id"] = max(snapshot["last_id"], int(delta["ID_BET"].max()))
+    last_date = pd.to_datetime(delta["tourney_date"], errors="coerce").max()
+    if snapshot["last_date"] is None or last_date > snapshot["last_date"]:
+        snapshot["last_date"] = last_date
+    snapshot["pending_ids"] = delta.loc[pending, "ID_BET"].astype(int).tolist()
+
+    # undecided bets stay pending without being shown, as in prepare_all_bets
+    shown = settled | inplay
+    delta = delta[shown].reset_index(drop=True)
+    settled = settled[shown].reset_index(drop=True)
+    if delta.empty:
+        return snapshot
+    delta_bets = _prepare_bets(delta, finished=None)
+    if not settled.all():
+        snapshot["inplay"] = _group_bets(delta_bets[~delta_bets["settled"]])
+    if not settled.any():
+        return snapshot
+
+    new_bets = delta_bets[delta_bets["settled"]]
+    if snapshot["prepared"] is None:
+        prepared = new_bets
+    else:
+        prepared = pd.concat([snapshot["prepared"], new_bets], ignore_index=True)
+        prepared = prepared.drop_duplicates(subset="ID_BET", keep="last")
+    prepared = prepared.sort_values(by="Date", kind="stable").reset_index(drop=True)
+    snapshot["prepared"] = prepared
+
+    old_grouped = snapshot["grouped"]
+    affected = pd.MultiIndex.from_frame(new_bets[GROUP_KEYS]).unique()
+    if old_grouped is None or old_grouped.empty:
+        snapshot["grouped"] = _group_bets(prepared)
+        return snapshot
+
+    kept = old_grouped[
+        ~pd.MultiIndex.from_frame(old_grouped[GROUP_KEYS]).isin(affected)
+    ]
+    touched = prepared[pd.MultiIndex.from_frame(prepared[GROUP_KEYS]).isin(affected)]
+    regrouped = _aggregate_bets(touched)
+    if kept.empty or regrouped.empty:
+        snapshot["grouped"] = _group_bets(prepared)
+        return snapshot
+    grouped = _sort_grouped_bets(pd.concat([kept, regrouped], ignore_index=True))
+
+    # Rows before the first touched group keep their cumulative gains
+    changed = pd.MultiIndex.from_frame(grouped[GROUP_KEYS]).isin(affected)
+    start = int(np.argmax(changed))
+    base = grouped["Cumulative Gains"].iloc[start - 1] if start > 0 else 0.0
+    tail = np.concatenate([[base], grouped["Gains net"].to_numpy()[start:]]).cumsum()
+    grouped["Cumulative Gains"] = np.concatenate(
+        [grouped["Cumulative Gains"].to_numpy()[:start], tail[1:]]
+    )
+    snapshot["grouped"] = grouped
+    return snapshot
+
+
+def _database_digest() -> str:
+    # snapshots are only valid against the database they were built from
+    return hashlib.sha1(db_utils.DB_URL.encode()).hexdigest()[:12]
+
+
+def _snapshot_paths(user_id: int) -> dict:
+    stem = os.path.join(
+        SNAPSHOT_DIR,
+        f"bets_user{int(user_id)}_v{SNAPSHOT_SCHEMA_VERSION}_{_database_digest()}",
+    )
+    return {
+        "prepared": f"{stem}.parquet",
+        "grouped": f"{stem}_grouped.parquet",
+        "inplay": f"{stem}_inplay.parquet",
+        "meta": f"{stem}.json",
+    }
+
+
+def _save_snapshot(user_id: int, snapshot: dict) -> None:
+    """
+    Writes a snapshot to disk (per-bet, grouped and in-play Parquet files plus
+    the watermarks as JSON). Files are replaced atomically, meta last.
+    """
+    if snapshot["prepared"] is None:
+        return
+    paths = _snapshot_paths(user_id)
+    meta = {
+        "schema_version": SNAPSHOT_SCHEMA_VERSION,
+        "user_id": int(user_id),
+        "database": snapshot["database"],
+        "date_from": str(snapshot["date_from"]),
+        "last_id": int(snapshot["last_id"]),
+        "last_date": None
+        if pd.isna(snapshot["last_date"])
+        else str(snapshot["last_date"]),
+        "pending_ids": [int(i) for i in snapshot["pending_ids"]],
+        "saved_at": pd.Timestamp.now().isoformat(),
+    }
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        for key in ("prepared", "grouped", "inplay"):
+            frame = snapshot[key]
+            if frame is None:
+                frame = _empty_bets_frame()
+            frame.to_parquet(f"{paths[key]}.tmp", index=False)
+            os.replace(f"{paths[key]}.tmp", paths[key])
+        with open(f"{paths['meta']}.tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(f"{paths['meta']}.tmp", paths["meta"])
+    except Exception:
+        logger.exception(f"Could not save bets snapshot of user {user_id}")
+
+
+def _load_snapshot(user_id: int, date_from) -> dict | None:
+    """
+    Reads the on-disk snapshot of a user, or None if it is missing, was
+    written with another schema version, against another database or for
+    another date window.
+    """
+    paths = _snapshot_paths(user_id)
+    if not os.path.exists(paths["meta"]):
+        return None
+    try:
+        with open(paths["meta"]) as f:
+            meta = json.load(f)
+        if (
+            meta.get("schema_version") != SNAPSHOT_SCHEMA_VERSION
+            or meta.get("database") != _database_digest()
+            or meta.get("date_from") != str(date_from)
+        ):
+            return None
+        return {
+            "database": meta["database"],
+            "date_from": date_from,
+            "last_id": meta["last_id"],
+            "last_date": pd.Timestamp(meta["last_date"]) if meta["last_date"] else None,
+            "pending_ids": meta["pending_ids"],
+            "prepared": pd.read_parquet(paths["prepared"]),
+            "grouped": pd.read_parquet(paths["grouped"]),
+            # as of the last save: settled bets or new bets trigger one
+            "inplay": pd.read_parquet(paths["inplay"]),
+        }
+    except Exception:
+        logger.exception(f"Could not load bets snapshot of user {user_id}")
+        return None
+
+
+def _snapshot_watermarks(snapshot: dict) -> tuple:
+    return (
+        snapshot["last_id"],
+        snapshot["last_date"],
+        frozenset(snapshot["pending_ids"]),
+    )
+
+
+def _revalidate_in_background(user_id: int, date_from, on_done=None) -> None:
+    def _run():
+        try:
+            _refresh_snapshot(user_id, date_from, background=False)
+            if on_done is not None:
+                on_done()
+        except Exception:
+            logger.exception(f"Background refresh of user {user_id} bets failed")
+
+    threading.Thread(target=_run, name=f"bets-refresh-{user_id}", daemon=True).start()
+
+
+def _refresh_snapshot(
+    user_id: int, date_from=BETS_START_DATE, background: bool = True
+) -> dict:
     """
-    query_matchs = """SELECT  tourney_name,
+    Brings the snapshot of a user up to date and returns it. Without an
+    in-memory snapshot the on-disk one is used: returned as is and flagged
+    stale when background is True (see revalidate_bets_snapshot), otherwise
+    updated synchronously with the (small) delta.
+    """
+    store = _bets_snapshots()
+    with _snapshot_lock(user_id):
+        snapshot = store["users"].get(user_id)
+        if (
+            snapshot is None
+            or snapshot["date_from"] != date_from
+            or snapshot["database"] != _database_digest()
+        ):
+            snapshot = _load_snapshot(user_id, date_from)
+            if snapshot is not None and background:
+                snapshot["stale"] = True
+                store["users"].set(user_id, snapshot)
+                # only served stale when kept for revalidate_bets_snapshot,
+                # a snapshot over the budget is refreshed right away
+                if store["users"].get(user_id) is snapshot:
+                    return snapshot
+        if snapshot is None:
+            snapshot = {
+                "database": _database_digest(),
+                "date_from": date_from,
+                "last_id": 0,
+                "last_date": None,
+                "pending_ids": [],
+                "prepared": None,
+                "grouped": None,
+                "inplay": None,
+            }
+        watermarks = _snapshot_watermarks(snapshot)
+        prepared = snapshot["prepared"]
+        delta = load_bets_delta(
+            user_id, snapshot["last_id"], snapshot["pending_ids"], date_from
+        )
+        snapshot = _merge_bets_delta(snapshot, delta)
+        snapshot.update(stale=False, revalidating=False)
+        store["users"].set(user_id, snapshot)
+        # the delta always holds the pending bets: only rewrite the files when
+        # bets were settled, added or dropped from the pending ones
+        moved = watermarks != _snapshot_watermarks(snapshot)
+        if moved or snapshot["prepared"] is not prepared:
+            _save_snapshot(user_id, snapshot)
+        return snapshot
+
+
+def revalidate_bets_snapshot(user_id: int, on_done=None) -> bool:
+    """
+    Refreshes on a thread the snapshot of a user when it was served from disk
+    and not refreshed since, then calls on_done (e.g. to drop a cached copy of
+    the stale frames). Returns whether a refresh was started.
+    """
+    store = _bets_snapshots()
+    with _snapshot_lock(user_id):
+        snapshot = store["users"].get(user_id)
+        if snapshot is None or not snapshot.get("stale"):
+            return False
+        if snapshot.get("revalidating"):
+            return False
+        snapshot["revalidating"] = True
+    _revalidate_in_background(user_id, snapshot["date_from"], on_done)
+    return True
+
+
+def refresh_bets_data(user_id: int, date_from=BETS_START_DATE) -> pd.DataFrame:
+    """
+    Returns the grouped settled bets of a user like prepare_bets_data, but
+    only fetches the bets that are new or were settled since the last call.
+    The first call for a user builds the snapshot with a single query, or
+    serves the on-disk snapshot and revalidates it in the background.
+    """
+    snapshot = _refresh_snapshot(user_id, date_from)
+    revalidate_bets_snapshot(user_id)
+    if snapshot["grouped"] is None or snapshot["grouped"].empty:
+        return _empty_bets_frame()
+    return snapshot["grouped"].copy()
+
+
+def refresh_all_bets(user_id: int, date_from=BETS_START_DATE) -> pd.DataFrame:
+    """
+    Incremental counterpart of prepare_all_bets: settled and in-play grouped
+    bets with a Statut column, from a single delta query. On a cold start the
+    on-disk snapshot is returned as is: call revalidate_bets_snapshot once the
+    result is stored to refresh it in the background.
+    """
+    snapshot = _refresh_snapshot(user_id, date_from)
+    frames = []
+    for key, label in (
+        ("grouped", STATUS_LABELS[True]),
+        ("inplay", STATUS_LABELS[False]),
+    ):
+        if snapshot[key] is not None and not snapshot[key].empty:
+            frames.append(snapshot[key].assign(Statut=label))
+    if not frames:
+        return _empty_bets_frame().assign(Statut=pd.Series(dtype=object))
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_inplay_bets(user_id: int, date_from=None, date_to=None):
+    """
+    Loads the unsettled bets_data for a given user from the database.
+    """
+    query_bets, params = _bets_query(INPLAY_FILTER, date_from, date_to)
+    params["user_id"] = int(user_id)
+    bets_data = read_sql_query(BDD, query_bets, params=params, dtypes=BETS_DTYPES)
+    return _sort_by_date(bets_data)
+
+
+async def aload_inplay_bets(user_id: int, date_from=None, date_to=None):
+    """
+    Async counterpart of load_inplay_bets.
+    """
+    query_bets, params = _bets_query(INPLAY_FILTER, date_from, date_to)
+    params["user_id"] = int(user_id)
+    bets_data = await aread_sql_query(
+        BDD, query_bets, params=params, dtypes=BETS_DTYPES
+    )
+    return _sort_by_date(bets_data)
+
+
+def load_inplay_summary(user_id: int) -> dict:
+    """
+    Counts the in-play bets of a user as grouped by prepare_bets_data (one per
+    match and side beted) and sums their stake, in a single aggregated query.
+    """
+    branches = [
+        f"""SELECT b.ID_MATCH, b.bet, b.stake
+                                    FROM Bet b join {table} m on (b.ID_MATCH = m.ID_MATCH)
+                                        join predictions p on (m.ID_MATCH = p.ID_MATCH)
+                                        WHERE b.ID_USER = :user_id and ({INPLAY_FILTER})"""
+        for table, *_ in MATCH_TABLES
+    ]
+    union = "\n                    UNION ALL\n                        ".join(branches)
+    query_summary = f"""SELECT COUNT(*) as n_bets, COALESCE(SUM(stake), 0) as total_stake
+                    FROM (SELECT ID_MATCH, bet, SUM(stake) as stake
+                            FROM ({union}) u
+                            GROUP BY ID_MATCH, bet) g"""
+    summary = read_sql_query(BDD, query_summary, params={"user_id": int(user_id)})
+    return {
+        "n_bets": int(summary["n_bets"].iloc[0]),
+        "total_stake": round(float(summary["total_stake"].iloc[0]), 2),
+    }
+
+
+FUTURE_MATCHS_QUERY = """SELECT  tourney_name,
                             tourney_level,
                             m.winner_name,
                             m.loser_name,
@@ -488,7 +1044,176 @@ def load_future_matchs():
                                     right join odds o on (m.ID_MATCH = o.id)
                                     right join predictions p on (m.ID_MATCH = p.ID_MATCH)
                                         WHERE match_settled = 0"""
-    matchs_data = read_sql_query(BDD, query_matchs)
-    matchs_data.sort_values(by="tourney_date", ascending=True, inplace=True)
-    matchs_data.reset_index(drop=True, inplace=True)
-    return matchs_data
+
+
+def load_future_matchs():
+    """
+    Loads the future matchs from the database.
+    """
+    # identical for every session: served from the db_utils result cache
+    matchs_data = read_sql_query(
+        BDD,
+        FUTURE_MATCHS_QUERY,
+        dtypes=FUTURE_MATCHS_DTYPES,
+        cache_ttl=FUTURE_MATCHS_CACHE_TTL,
+        cache_tags=["future_matchs"],
+    )
+    return _sort_by_date(matchs_data)
+
+
+async def aload_future_matchs():
+    """
+    Async counterpart of load_future_matchs, sharing its cached result.
+    """
+    matchs_data = await aread_sql_query(
+        BDD,
+        FUTURE_MATCHS_QUERY,
+        dtypes=FUTURE_MATCHS_DTYPES,
+        cache_ttl=FUTURE_MATCHS_CACHE_TTL,
+        cache_tags=["future_matchs"],
+    )
+    return _sort_by_date(matchs_data)
+
+
+OPPORTUNITY_COLUMNS = [
+    "ID_MATCH",
+    "Match",
+    "Joueur",
+    "Prédiction",
+    "Max_cote",
+    "EV_pct",
+    "Parier ?",
+    "Lien",
+    "Tournoi",
+    "Compétition",
+    "Date",
+]
+
+
+def _interleave(winner_side, loser_side) -> np.ndarray:
+    # one row per player: the winner side of each match, then its loser side
+    return np.column_stack([np.asarray(winner_side), np.asarray(loser_side)]).ravel()
+
+
+def compute_opportunities(
+    df: pd.DataFrame,
+    min_marge: float = MIN_MARGE,
+    min_pred: float = MIN_PRED_BETABLE,
+    max_pred: float = MAX_PRED_BETABLE,
+) -> pd.DataFrame:
+    """
+    One row per player of every future match with its prediction, the best
+    available odds and their expected value EV_pct (in %). A side is to bet
+    on (Parier ?) when EV_pct > min_marge and min_pred <= prediction <= max_pred.
+    Rows are sorted by date and match, the winner side first.
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=OPPORTUNITY_COLUMNS)
+
+    # missing or invalid predictions and odds count as 0
+    preds = _interleave(
+        pd.to_numeric(df["winner_pred"], errors="coerce").fillna(0.0),
+        pd.to_numeric(df["loser_pred"], errors="coerce").fillna(0.0),
+    )
+    max_odds = _interleave(
+        pd.to_numeric(df["max_odds1"], errors="coerce").fillna(0.0),
+        pd.to_numeric(df["max_odds2"], errors="coerce").fillna(0.0),
+    )
+    # no EV when the odds or the prediction is missing
+    priced = (max_odds != 0) & (preds != 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ev = np.where(priced, (max_odds / np.where(priced, preds, 1.0) - 1) * 100, 0.0)
+    betable = (ev > min_marge) & (preds >= min_pred) & (preds <= max_pred)
+
+    match_idx = np.repeat(np.arange(len(df)), 2)
+    match = df["winner_name"].astype(str) + " - " + df["loser_name"].astype(str)
+    out = pd.DataFrame(
+        {
+            "ID_MATCH": df["ID_MATCH"].to_numpy()[match_idx],
+            "Match": match.to_numpy()[match_idx],
+            "Joueur": _interleave(df["winner_name"], df["loser_name"]),
+            "Prédiction": preds.round(3),
+            "Max_cote": max_odds.round(3),
+            "EV_pct": ev.round(1),
+            "Parier ?": betable,
+            "Lien": df["odds_lien"].to_numpy()[match_idx],
+            "Tournoi": df["tourney_name"].astype(str).to_numpy()[match_idx],
+            "Compétition": _map_distinct(df["compet"], str.title).to_numpy()[match_idx],
+            "Date": pd.to_datetime(df["tourney_date"], errors="coerce").to_numpy()[
+                match_idx
+            ],
+        }
+    )
+    out = out.sort_values(by=["Date", "Match"], ascending=[True, True], kind="stable")
+    return out.reset_index(drop=True)
+
+
+ODDS_SEARCH_URL = "https://www.oddsportal.com/search/?q="
+FLASH_MATCH_URL = "https://www.flashscore.com/match/"
+FLASH_SEARCH_URL = "https://www.flashscore.com/search/?q="
+
+
+def opportunity_links(opportunities: pd.DataFrame) -> pd.DataFrame:
+    """
+    Odds_URL (the odds link, else an OddsPortal search) and Flash_URL (the
+    Flashscore match page, else a search) of compute_opportunities rows. The
+    search query is "<Match> <Joueur>", URL-encoded.
+    """
+    queries = (
+        opportunities["Match"].astype(str) + " " + opportunities["Joueur"].astype(str)
+    ).str.strip()
+    encoded = pd.Series(
+        [quote_plus(q) for q in queries], index=opportunities.index, dtype=object
+    )
+    links = opportunities["Lien"]
+    has_link = links.notna() & (links.astype(str) != "")
+    match_ids = opportunities["ID_MATCH"]
+    has_id = match_ids.notna() & (match_ids.astype(str) != "")
+    return pd.DataFrame(
+        {
+            "Odds_URL": links.where(has_link, ODDS_SEARCH_URL + encoded),
+            "Flash_URL": (FLASH_MATCH_URL + match_ids.astype(str)).where(
+                has_id, FLASH_SEARCH_URL + encoded
+            ),
+        },
+        index=opportunities.index,
+    )
+
+
+def filter_opportunities(
+    opportunities: pd.DataFrame,
+    compets=(),
+    tourneys=(),
+    date_range=None,
+    only_betable: bool = False,
+) -> pd.DataFrame:
+    """
+    Rows of a compute_opportunities frame in the given competitions and
+    tournaments (empty: no filter), between the two bounds of date_range
+    (inclusive) and, with only_betable, flagged Parier ?.
+    """
+    mask = np.ones(len(opportunities), dtype=bool)
+    if compets:
+        mask &= opportunities["Compétition"].isin(compets).to_numpy()
+    if tourneys:
+        mask &= opportunities["Tournoi"].isin(tourneys).to_numpy()
+    if date_range is not None:
+        dates = opportunities["Date"]
+        mask &= (
+            (dates >= pd.Timestamp(date_range[0]))
+            & (dates <= pd.Timestamp(date_range[1]))
+        ).to_numpy()
+    if only_betable:
+        mask &= opportunities["Parier ?"].to_numpy(dtype=bool)
+    return opportunities[mask]
+
+
+def page_of(frame: pd.DataFrame, page: int, page_size: int) -> tuple[pd.DataFrame, int]:
+    """
+    Rows of a 1-based page of frame and the page count (at least 1). Pages
+    past the last one are clamped to it.
+    """
+    n_pages = max(1, -(-len(frame) // page_size))
+    page = min(max(int(page), 1), n_pages)
+    start = (page - 1) * page_size
+    return frame.iloc[start : start + page_size], n_pages
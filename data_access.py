@@ -0,0 +1,210 @@
+import sys
+from functools import partial
+
+import pandas as pd
+import streamlit as st
+
+sys.path.append(st.session_state["project_path"])
+from data import (
+    MAX_PRED_BETABLE,
+    MIN_MARGE,
+    MIN_PRED_BETABLE,
+    compute_opportunities,
+    drop_bets_snapshot,
+    filter_opportunities,
+    load_bankroll,
+    load_future_matchs,
+    load_inplay_summary,
+    opportunity_links,
+    refresh_all_bets,
+    revalidate_bets_snapshot,
+    split_bets,
+)
+from db_utils.cache import LRUCache
+from db_utils.db_utils import invalidate_query_cache, run_parallel
+
+# Seconds before a cached dataset is reloaded
+DATASET_TTL = {
+    "all_bets": 60,
+    "inplay_summary": 30,
+    "bankroll": 300,
+    # derived from the future matches, whose raw query result is cached for
+    # data.FUTURE_MATCHS_CACHE_TTL in the db_utils result cache
+    "opportunities": 120,
+    "opportunities_view": 30,
+}
+THRESHOLDS = (MIN_MARGE, MIN_PRED_BETABLE, MAX_PRED_BETABLE)
+DATA_CACHE_MAX_MB = 256
+
+
+@st.cache_resource(show_spinner=False)
+def get_data_cache() -> LRUCache:
+    """
+    Returns the process-wide data cache shared by every Streamlit session.
+    """
+    max_mb = st.secrets.get("data_cache_max_mb", DATA_CACHE_MAX_MB)
+    return LRUCache(max_bytes=int(max_mb) * 1024 * 1024)
+
+
+def _cached(dataset: str, user_id, loader: callable, params: tuple = ()):
+    """
+    Reads a dataset through the cache, keyed by (user, dataset, params).
+    DataFrames are copied so pages can modify them freely.
+    """
+    tags = [f"dataset={dataset}"]
+    if user_id is not None:
+        tags.append(f"user={user_id}")
+    value = get_data_cache().get_or_set(
+        (user_id, dataset, params), loader, ttl=DATASET_TTL[dataset], tags=tags
+    )
+    if isinstance(value, pd.DataFrame):
+        return value.copy()
+    return value
+
+
+def get_all_bets(user_id: int) -> pd.DataFrame:
+    """
+    Settled and in-play grouped bets of a user with a Statut column, from one
+    shared cache entry (see data.refresh_all_bets).
+    """
+    all_bets = _cached("all_bets", user_id, lambda: refresh_all_bets(user_id))
+    # a cold start serves the on-disk snapshot: refresh it in the background
+    # and drop the entry once it is up to date
+    revalidate_bets_snapshot(
+        user_id, on_done=partial(invalidate_user, user_id, "all_bets")
+    )
+    return all_bets
+
+
+def get_bets(user_id: int) -> pd.DataFrame:
+    """
+    Grouped settled bets of a user.
+    """
+    return split_bets(get_all_bets(user_id))[0]
+
+
+def get_inplay_bets(user_id: int) -> pd.DataFrame:
+    """
+    Grouped in-play bets of a user.
+    """
+    return split_bets(get_all_bets(user_id))[1]
+
+
+def get_inplay_summary(user_id: int) -> dict:
+    """
+    In-play bet count and stake total of a user, for the navigation badge.
+    """
+    return _cached("inplay_summary", user_id, lambda: load_inplay_summary(user_id))
+
+
+def get_bankroll(user_id: int):
+    return _cached("bankroll", user_id, lambda: load_bankroll(user_id))
+
+
+def get_future_matchs() -> pd.DataFrame:
+    # the query result is already shared through the db_utils result cache
+    return load_future_matchs()
+
+
+def _build_opportunities(thresholds: tuple) -> pd.DataFrame:
+    opportunities = compute_opportunities(get_future_matchs(), *thresholds)
+    opportunities["Heure"] = opportunities["Date"].dt.strftime("%H:%M").fillna("")
+    # link columns are built once here instead of on every page rerun
+    return opportunities.join(opportunity_links(opportunities))
+
+
+def get_opportunities(thresholds: tuple = THRESHOLDS) -> pd.DataFrame:
+    """
+    Per-player opportunities of the future matches for (min_marge, min_pred,
+    max_pred) thresholds, see data.compute_opportunities, with the Heure,
+    Odds_URL and Flash_URL columns.
+    """
+    thresholds = tuple(thresholds)
+    return _cached(
+        "opportunities", None, lambda: _build_opportunities(thresholds), thresholds
+    )
+
+
+def get_opportunities_view(
+    thresholds: tuple = THRESHOLDS,
+    compets=(),
+    tourneys=(),
+    date_range=None,
+    only_betable: bool = False,
+    sort_by=(),
+    ascending: bool = True,
+) -> pd.DataFrame:
+    """
+    Filtered opportunities (see data.filter_opportunities), optionally sorted
+    by the sort_by columns, cached per filter tuple on top of get_opportunities.
+    """
+    thresholds = tuple(thresholds)
+    filters = (
+        tuple(compets),
+        tuple(tourneys),
+        None if date_range is None else tuple(pd.Timestamp(d) for d in date_range),
+        bool(only_betable),
+    )
+    order = (tuple(sort_by), bool(ascending))
+
+    def _load():
+        view = filter_opportunities(get_opportunities(thresholds), *filters)
+        if order[0]:
+            view = view.sort_values(list(order[0]), ascending=order[1], kind="stable")
+        return view
+
+    return _cached("opportunities_view", None, _load, (thresholds, filters, order))
+
+
+def get_many(user_id: int, datasets: list, errors: dict | None = None) -> dict:
+    """
+    Reads several datasets of a user (names of DATASET_GETTERS) in one
+    parallel batch, see db_utils.run_parallel for errors.
+    """
+    tasks = {name: partial(DATASET_GETTERS[name], user_id) for name in datasets}
+    return run_parallel(tasks, errors=errors)
+
+
+DATASET_GETTERS = {
+    "all_bets": get_all_bets,
+    "bets": get_bets,
+    "inplay_bets": get_inplay_bets,
+    "inplay_summary": get_inplay_summary,
+    "bankroll": get_bankroll,
+    "future_matchs": lambda user_id: get_future_matchs(),
+}
+
+
+def invalidate_user(user_id: int, dataset: str | None = None) -> int:
+    """
+    Drops the cached datasets of a user (all of them, or only one dataset).
+    Dropping all of them also drops the user's in-memory bets snapshot.
+    """
+    cache = get_data_cache()
+    if dataset is None:
+        drop_bets_snapshot(user_id)
+        return cache.invalidate_tag(f"user={user_id}")
+    return int(cache.invalidate((user_id, dataset, ())))
+
+
+def invalidate_dataset(dataset: str) -> int:
+    return get_data_cache().invalidate_tag(f"dataset={dataset}")
+
+
+def invalidate_future_matchs() -> None:
+    """
+    Drops every layer of the future matches: the raw query result and the
+    opportunities derived from it.
+    """
+    invalidate_query_cache("future_matchs")
+    invalidate_dataset("opportunities")
+    invalidate_dataset("opportunities_view")
+
+
+def notify_new_bet(user_id: int) -> None:
+    """
+    Hook to call when a Bet row lands for a user: the next read reloads the
+    user's bets (incrementally for the settled ones).
+    """
+    invalidate_user(user_id, "all_bets")
+    invalidate_user(user_id, "inplay_summary")
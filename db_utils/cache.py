@@ -0,0 +1,150 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def sizeof(value) -> int:
+    """
+    Estimates the memory footprint of a cached value in bytes.
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            sizeof(k) + sizeof(v) for k, v in value.items()
+        )
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with a TTL per entry, a global byte budget and
+    tag-based invalidation. Entries are evicted least recently used first
+    once the budget is exceeded.
+    """
+
+    def __init__(self, max_bytes: int, default_ttl: float | None = None):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._key_locks = {}
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _expired(self, entry: dict, now: float) -> bool:
+        return entry["expires_at"] is not None and entry["expires_at"] <= now
+
+    def _drop(self, key) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry["nbytes"]
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry, time.monotonic()):
+                if entry is not None:
+                    self._drop(key)
+                self._misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry["value"]
+
+    def set(self, key, value, ttl: float | None = None, tags=()) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        nbytes = sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if nbytes > self.max_bytes:
+                # larger than the whole budget: never cached
+                return
+            self._entries[key] = {
+                "value": value,
+                "expires_at": None if ttl is None else time.monotonic() + ttl,
+                "nbytes": nbytes,
+                "tags": frozenset(tags),
+            }
+            self._bytes += nbytes
+            self._evict()
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, e in self._entries.items() if self._expired(e, now)]:
+            self._drop(key)
+        while self._bytes > self.max_bytes and self._entries:
+            self._drop(next(iter(self._entries)))
+            self._evictions += 1
+
+    def get_or_set(self, key, loader: callable, ttl: float | None = None, tags=()):
+        """
+        Returns the cached value for key, calling loader() on a miss. Concurrent
+        misses on the same key wait for a single load.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+        with self._lock:
+            # one lock per key, shared by every caller loading or waiting on it
+            slot = self._key_locks.setdefault(
+                key, {"lock": threading.Lock(), "callers": 0}
+            )
+            slot["callers"] += 1
+        try:
+            with slot["lock"]:
+                with self._lock:
+                    entry = self._entries.get(key)
+                    if entry is not None and not self._expired(entry, time.monotonic()):
+                        return entry["value"]
+                value = loader()
+                self.set(key, value, ttl=ttl, tags=tags)
+                return value
+        finally:
+            with self._lock:
+                slot["callers"] -= 1
+                if slot["callers"] == 0 and self._key_locks.get(key) is slot:
+                    self._key_locks.pop(key)
+
+    def invalidate(self, key) -> bool:
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._drop(key)
+            return True
+
+    def invalidate_tag(self, tag: str) -> int:
+        """
+        Drops every entry carrying tag and returns how many were dropped.
+        """
+        with self._lock:
+            keys = [k for k, e in self._entries.items() if tag in e["tags"]]
+            for key in keys:
+                self._drop(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
@@ -1,71 +1,882 @@
 # ruff: noqa: E402
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 import pandas as pd
+import pyarrow as pa
 from tqdm import tqdm
-from sqlalchemy.sql import text
+from sqlalchemy.sql import text, TextClause
 import sqlalchemy
 import logging
 import locale
+import asyncio
+import contextvars
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from functools import partial
 
 
 import os
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 
 os.chdir(st.session_state["project_path"])
 import sys
 
 sys.path.append(st.session_state["project_path"])
+from db_utils import local_backend
+from db_utils.cache import LRUCache, sizeof
 from db_utils.globals import DB_URL
+from db_utils.query_log import (
+    QueryLog,
+    calling_page,
+    canonical_sql,
+    fingerprint,
+    normalize_sql,
+    referenced_tables,
+)
 
 locale.setlocale(locale.LC_ALL, "")
 logger = logging.getLogger("db_utils")
 logger.setLevel(logging.INFO)
 logging.basicConfig(format="%(asctime)s-%(levelname)s: %(message)s")
 
+# Pool settings, overridable from the [db_pool] section of st.secrets
+POOL_DEFAULTS = {
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_timeout": 30,
+    "pool_recycle": 3600,
+    "pool_pre_ping": True,
+}
+
+# Parallel reads, overridable from the [db_parallel] section of st.secrets.
+# timeout is in seconds for the whole batch.
+PARALLEL_DEFAULTS = {
+    "max_workers": 4,
+    "timeout": 60,
+}
+
+# Bulk inserts, overridable from the [db_bulk_load] section of st.secrets.
+# local_infile allows LOAD DATA LOCAL INFILE, which the MySQL server must
+# accept too; otherwise rows are sent batch_size at a time with executemany.
+BULK_LOAD_DEFAULTS = {
+    "local_infile": False,
+    "batch_size": 10_000,
+}
+
+# Bulk deletes: keys per DELETE ... IN statement, and the number of keys
+# above which they are joined through a temporary table instead
+DELETE_BATCH_SIZE = 1000
+DELETE_TEMP_TABLE_THRESHOLD = 50_000
+# Bulk updates: rows per executemany batch, and the number of rows above
+# which they are staged in a temporary table and applied with one UPDATE
+UPDATE_BATCH_SIZE = 1000
+UPDATE_STAGING_THRESHOLD = 50_000
+
+# Byte budget of the query-result cache, overridable with query_cache_max_mb
+# in st.secrets
+QUERY_CACHE_MAX_MB = 128
+
+# Async drivers per dialect of DB_URL, overridable with db_async_driver in
+# st.secrets
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+# Query log settings, overridable from the [query_log] section of st.secrets.
+# path, when set, mirrors every record to a JSON-lines file.
+QUERY_LOG_DEFAULTS = {
+    "max_records": 1000,
+    "path": None,
+}
+PROJECT_PATH = st.session_state["project_path"]
+# Page running the coroutines of run_async, for the query log
+_current_page = contextvars.ContextVar("current_page", default=None)
+# Rows per chunk yielded by the streaming readers
+STREAM_CHUNKSIZE = 10_000
+# dtypes="compact" turns string columns with at most this share of distinct
+# values into categoricals
+CATEGORY_MAX_RATIO = 0.5
+
+_pool_waits = {}
+_pool_waits_lock = threading.Lock()
+
+
+def _pool_options() -> dict:
+    options = dict(POOL_DEFAULTS)
+    try:
+        options.update(dict(st.secrets.get("db_pool", {})))
+    except Exception:
+        logger.exception("Invalid db_pool secrets, using defaults")
+    return options
+
+
+@st.cache_resource(show_spinner=False)
+def get_engine(schema: str) -> sqlalchemy.engine.Engine:
+    """
+    Returns the pooled engine for a schema, shared by every Streamlit session.
+    """
+    options = _pool_options()
+    if _bulk_load_options()["local_infile"]:
+        options["connect_args"] = {"local_infile": True}
+    logger.info(f"Creating pooled engine for schema {schema} ({options})")
+    engine = create_engine(f"{DB_URL}{schema}", **options)
+    _register_local_backend(engine)
+    return engine
+
+
+def _register_local_backend(engine: sqlalchemy.engine.Engine) -> None:
+    """
+    Adds the MySQL compatibility hook to engines on a local SQLite file
+    (see db_utils.local_backend).
+    """
+    if engine.url.get_backend_name() == "sqlite" and engine.url.database:
+        event.listen(
+            engine, "connect", partial(local_backend.on_connect, engine.url.database)
+        )
+
+
+def _record_wait(schema: str, elapsed: float) -> None:
+    with _pool_waits_lock:
+        waits = _pool_waits.setdefault(
+            schema, {"checkouts": 0, "wait_total_s": 0.0, "wait_max_s": 0.0}
+        )
+        waits["checkouts"] += 1
+        waits["wait_total_s"] += elapsed
+        waits["wait_max_s"] = max(waits["wait_max_s"], elapsed)
+
+
+@contextmanager
+def get_connection(schema: str, begin: bool = False):
+    """
+    Checks a connection out of the schema pool, timing the wait, and returns
+    it to the pool on exit. With begin=True the block runs in a transaction
+    committed on success.
+    """
+    engine = get_engine(schema)
+    start = time.perf_counter()
+    con = engine.connect()
+    _record_wait(schema, time.perf_counter() - start)
+    try:
+        if begin:
+            with con.begin():
+                yield con
+        else:
+            yield con
+    finally:
+        con.close()
+
+
+def pool_stats(schema: str | None = None) -> dict:
+    """
+    Returns pool usage per schema: size, checked-out and overflow connections
+    plus the number of checkouts and the time spent waiting for them.
+    """
+    with _pool_waits_lock:
+        waits = {key: dict(value) for key, value in _pool_waits.items()}
+    schemas = [schema] if schema is not None else list(waits)
+    stats = {}
+    for name in schemas:
+        pool = get_engine(name).pool
+        entry = {
+            "size": getattr(pool, "size", lambda: None)(),
+            "checked_out": getattr(pool, "checkedout", lambda: None)(),
+            "checked_in": getattr(pool, "checkedin", lambda: None)(),
+            "overflow": getattr(pool, "overflow", lambda: None)(),
+            "checkouts": 0,
+            "wait_total_s": 0.0,
+            "wait_max_s": 0.0,
+        }
+        entry.update(waits.get(name, {}))
+        entry["wait_avg_s"] = (
+            entry["wait_total_s"] / entry["checkouts"] if entry["checkouts"] else 0.0
+        )
+        stats[name] = entry
+    return stats
+
+
+def _parallel_options() -> dict:
+    options = dict(PARALLEL_DEFAULTS)
+    try:
+        options.update(dict(st.secrets.get("db_parallel", {})))
+    except Exception:
+        logger.exception("Invalid db_parallel secrets, using defaults")
+    return options
+
+
+def run_parallel(
+    tasks: dict,
+    max_workers: int | None = None,
+    timeout: float | None = None,
+    errors: dict | None = None,
+) -> dict:
+    """
+    Runs named callables on a bounded thread pool and returns their results by
+    name. Failed and timed-out tasks are logged and reported in errors when a
+    dict is given; otherwise the first failure is raised once the batch ends.
+    """
+    if not tasks:
+        return {}
+    options = _parallel_options()
+    max_workers = max_workers or int(options["max_workers"])
+    timeout = options["timeout"] if timeout is None else timeout
+
+    # workers run in the caller's Streamlit session
+    ctx = get_script_run_ctx()
+
+    def _attach_ctx():
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(tasks))), initializer=_attach_ctx
+    )
+    futures = {executor.submit(task): name for name, task in tasks.items()}
+    done, not_done = wait(futures, timeout=timeout)
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    results, failures = {}, {}
+    for future in not_done:
+        failures[futures[future]] = TimeoutError(f"Timed out after {timeout}s")
+    for future in done:
+        try:
+            results[futures[future]] = future.result()
+        except Exception as e:  # noqa: BLE001 - handed to the caller
+            failures[futures[future]] = e
+    return _batch_results(tasks, results, failures, errors)
+
+
+def _batch_results(tasks: dict, results: dict, failures: dict, errors) -> dict:
+    for name, e in failures.items():
+        logger.error(f"Parallel task {name} failed: {e}")
+    if errors is not None:
+        errors.update(failures)
+    elif failures:
+        raise next(iter(failures.values()))
+    return {name: results[name] for name in tasks if name in results}
+
+
+def _db_workers(schema: str, max_workers: int | None) -> int | None:
+    """
+    Caps parallel reads to the connections the schema pool can hand out.
+    """
+    options = _pool_options()
+    cap = int(options["pool_size"]) + max(int(options["max_overflow"]), 0)
+    return min(max_workers or int(_parallel_options()["max_workers"]), cap)
+
+
+@st.cache_resource(show_spinner=False)
+def _async_loop() -> asyncio.AbstractEventLoop:
+    """
+    Event loop running in a daemon thread for the whole process. Async engines
+    and their pooled connections live on it, so every session shares them.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(
+        target=loop.run_forever, name="db_utils-async", daemon=True
+    ).start()
+    return loop
+
+
+@st.cache_resource(show_spinner=False)
+def get_async_engine(schema: str) -> AsyncEngine:
+    """
+    Returns the pooled async engine for a schema, using the async driver of
+    the DB_URL dialect (aiomysql for MySQL).
+    """
+    url = sqlalchemy.engine.make_url(f"{DB_URL}{schema}")
+    driver = st.secrets.get("db_async_driver") or ASYNC_DRIVERS[url.get_backend_name()]
+    options = _pool_options()
+    logger.info(f"Creating async engine for schema {schema} ({driver})")
+    engine = create_async_engine(url.set(drivername=driver), **options)
+    _register_local_backend(engine.sync_engine)
+    return engine
+
+
+def run_async(coro, timeout: float | None = None):
+    """
+    Runs a coroutine on the db_utils event loop and waits for its result, from
+    synchronous (Streamlit) code.
+    """
+    page = calling_page(PROJECT_PATH)
+
+    async def _run():
+        # the loop thread does not see the page in its stack
+        _current_page.set(page)
+        return await coro
+
+    return asyncio.run_coroutine_threadsafe(_run(), _async_loop()).result(timeout)
+
+
+def gather(
+    coros: dict, timeout: float | None = None, errors: dict | None = None
+) -> dict:
+    """
+    Awaits named coroutines concurrently on the db_utils event loop, so the
+    batch takes as long as its slowest query:
+
+        data = gather({"bets": aload_bets(user_id), "bankroll": aload_bankroll(user_id)})
+
+    Failures and timeouts are handled as in run_parallel.
+    """
+    if not coros:
+        return {}
+    timeout = _parallel_options()["timeout"] if timeout is None else timeout
+
+    async def _gather():
+        tasks = {name: asyncio.ensure_future(coro) for name, coro in coros.items()}
+        _, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        return tasks, pending
+
+    tasks, pending = run_async(_gather())
+    results, failures = {}, {}
+    for name, task in tasks.items():
+        if task in pending:
+            failures[name] = TimeoutError(f"Timed out after {timeout}s")
+        elif task.exception() is not None:
+            failures[name] = task.exception()
+        else:
+            results[name] = task.result()
+    return _batch_results(coros, results, failures, errors)
+
+
+@st.cache_resource(show_spinner=False)
+def get_query_log() -> QueryLog:
+    """
+    Returns the process-wide query log, shared by every Streamlit session.
+    """
+    options = dict(QUERY_LOG_DEFAULTS)
+    try:
+        options.update(dict(st.secrets.get("query_log", {})))
+    except Exception:
+        logger.exception("Invalid query_log secrets, using defaults")
+    return QueryLog(max_records=int(options["max_records"]), path=options["path"])
+
+
+def recent_queries(last: int | None = None) -> pd.DataFrame:
+    """
+    Returns the last query log records (all of them by default), oldest first.
+    """
+    return pd.DataFrame(get_query_log().records(last))
+
+
+def _timed_read(
+    schema: str,
+    con,
+    query: str | TextClause,
+    params: dict | None = None,
+    connect_s: float = 0.0,
+    dtypes: dict | str | None = None,
+    page: str | None = None,
+) -> pd.DataFrame:
+    """
+    Runs a query on an open connection like pd.read_sql_query, recording the
+    execute, fetch and DataFrame build times, rows and bytes in the query log.
+    dtypes opts into compact decoding, see compact_frame.
+    """
+    record = _new_record(schema, query, connect_s, page)
+    step = time.perf_counter()
+    try:
+        if isinstance(query, str):
+            result = con.exec_driver_sql(query)
+        else:
+            result = con.execute(query, params or {})
+        record["execute_ms"] = round((time.perf_counter() - step) * 1000, 2)
+        return _build_frame(record, result, dtypes)
+    except Exception as e:
+        record["error"] = str(e)
+        get_query_log().record(**record)
+        raise
+
+
+def _build_frame(record: dict, result, dtypes) -> pd.DataFrame:
+    """
+    Fetches an executed result into a DataFrame, timing the fetch and build
+    steps, and logs the query record.
+    """
+    step = time.perf_counter()
+    columns = list(result.keys())
+    rows = result.fetchall()
+    record["fetch_ms"] = round((time.perf_counter() - step) * 1000, 2)
+
+    step = time.perf_counter()
+    df = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+    if dtypes is not None:
+        compact_frame(df, dtypes)
+    record["build_ms"] = round((time.perf_counter() - step) * 1000, 2)
+    record["rows"] = len(df)
+    record["bytes"] = sizeof(df)
+    _log_query(record)
+    return df
+
+
+def compact_frame(df: pd.DataFrame, dtypes: dict | str = "compact") -> pd.DataFrame:
+    """
+    Shrinks a query result in place: integers are downcast, floats become
+    float32 when that is lossless, and string columns are cast to the dtypes
+    of the schema (e.g. "category", "string[pyarrow]"). With dtypes="compact"
+    low-cardinality string columns become categoricals.
+    """
+    schema = {} if dtypes == "compact" else dtypes
+    for col in df.columns:
+        try:
+            if col in schema:
+                df[col] = df[col].astype(schema[col])
+            elif pd.api.types.is_integer_dtype(df[col]):
+                df[col] = pd.to_numeric(df[col], downcast="integer")
+            elif pd.api.types.is_float_dtype(df[col]):
+                downcast = df[col].astype("float32")
+                if downcast.astype(df[col].dtype).equals(df[col]):
+                    df[col] = downcast
+            elif (
+                dtypes == "compact"
+                and df[col].dtype == object
+                and len(df)
+                and df[col].nunique() <= CATEGORY_MAX_RATIO * len(df)
+            ):
+                df[col] = df[col].astype("category")
+        except Exception:
+            logger.exception(f"Could not compact column {col}")
+    return df
+
+
+def _new_record(schema: str, query, connect_s: float, page: str | None = None) -> dict:
+    record = {
+        "schema": schema,
+        "fingerprint": fingerprint(query),
+        "sql": normalize_sql(query)[:500],
+        # worker threads do not see the page in their stack, callers pass it
+        "page": page or _current_page.get() or calling_page(PROJECT_PATH),
+        "connect_ms": round(connect_s * 1000, 2),
+    }
+    logger.debug(f"Query {record['fingerprint']}: {query}")
+    return record
+
+
+def _log_query(record: dict) -> None:
+    record["total_ms"] = round(
+        sum(record[k] for k in ("connect_ms", "execute_ms", "fetch_ms", "build_ms")),
+        2,
+    )
+    get_query_log().record(**record)
+    logger.info(
+        f"Query {record['fingerprint']} on {record['schema']} from {record['page']}: "
+        f"{record['rows']} rows, {record['bytes']} bytes in {record['total_ms']} ms "
+        f"(connect {record['connect_ms']} / execute {record['execute_ms']} / "
+        f"fetch {record['fetch_ms']} / build {record['build_ms']})"
+    )
+
+
+def stream_sql_query(
+    schema: str,
+    query: str | TextClause,
+    params: dict | None = None,
+    chunksize: int = STREAM_CHUNKSIZE,
+    arrow: bool = False,
+):
+    """
+    Yields the result of a query as DataFrames of at most chunksize rows (or
+    pyarrow RecordBatches with arrow=True). Rows are read through a server-side
+    cursor, so memory is bounded by the chunk size rather than the result size.
+    The connection stays checked out until the iterator is exhausted or closed.
+    """
+    if params is not None and isinstance(query, str):
+        query = text(query)
+    start = time.perf_counter()
+    with get_connection(schema) as con:
+        record = _new_record(schema, query, time.perf_counter() - start)
+        record.update(fetch_ms=0.0, build_ms=0.0, rows=0, bytes=0, chunks=0)
+        step = time.perf_counter()
+        try:
+            # stream_results switches PyMySQL to an unbuffered SSCursor
+            con = con.execution_options(stream_results=True)
+            if isinstance(query, str):
+                result = con.exec_driver_sql(query)
+            else:
+                result = con.execute(query, params or {})
+            record["execute_ms"] = round((time.perf_counter() - step) * 1000, 2)
+            columns = list(result.keys())
+
+            while True:
+                step = time.perf_counter()
+                rows = result.fetchmany(chunksize)
+                record["fetch_ms"] += (time.perf_counter() - step) * 1000
+                if not rows and record["chunks"]:
+                    break
+
+                step = time.perf_counter()
+                chunk = pd.DataFrame.from_records(
+                    rows, columns=columns, coerce_float=True
+                )
+                if arrow:
+                    chunk = pa.RecordBatch.from_pandas(chunk, preserve_index=False)
+                record["build_ms"] += (time.perf_counter() - step) * 1000
+                record["rows"] += len(rows)
+                record["bytes"] += chunk.nbytes if arrow else sizeof(chunk)
+                record["chunks"] += 1
+                # an empty result still yields one empty chunk with its columns
+                yield chunk
+                if not rows:
+                    break
+        except Exception as e:
+            record["error"] = str(e)
+            get_query_log().record(**record)
+            raise
+        record["fetch_ms"] = round(record["fetch_ms"], 2)
+        record["build_ms"] = round(record["build_ms"], 2)
+        _log_query(record)
+
 
 def read_table(schema: str, table_name: str) -> pd.DataFrame:
     logger.info(f"Reading table {table_name} from schema {schema}")
-    connection = create_engine(f"{DB_URL}{schema}")
-    df = pd.read_sql_table(table_name, con=connection)
-    connection.dispose()
+    with get_connection(schema) as con:
+        df = pd.read_sql_table(table_name, con=con)
     logger.info(f"Table read successfully, shape: {df.shape}")
     return df
 
 
-def read_sql_query(schema: str, query: str) -> pd.DataFrame:
-    logger.info(f"Reading table from schema {schema} with query: {query}")
-    connection = create_engine(f"{DB_URL}{schema}")
-    df = pd.read_sql_query(query, con=connection)
-    connection.dispose()
-    logger.info(f"Table read successfully, shape: {df.shape}")
+@st.cache_resource(show_spinner=False)
+def get_result_cache() -> LRUCache:
+    """
+    Returns the process-wide query-result cache, shared by every session.
+    """
+    max_mb = st.secrets.get("query_cache_max_mb", QUERY_CACHE_MAX_MB)
+    return LRUCache(max_bytes=int(max_mb) * 1024 * 1024)
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+def invalidate_query_cache(tag: str | None = None) -> int:
+    """
+    Drops the cached results carrying tag, or all of them. Entries are tagged
+    "schema=<schema>", "table=<table>" for every table they read, plus the
+    cache_tags given to read_sql_query.
+    """
+    cache = get_result_cache()
+    if tag is None:
+        dropped = cache.stats()["entries"]
+        cache.clear()
+        return dropped
+    return cache.invalidate_tag(tag)
+
+
+def _invalidate_table(table_name: str) -> None:
+    # writes through db_utils drop the cached reads of the table
+    invalidate_query_cache(f"table={table_name.split('.')[-1]}")
+
+
+def read_sql_query(
+    schema: str,
+    query: str | TextClause,
+    params: dict | None = None,
+    dtypes: dict | str | None = None,
+    cache_ttl: float | None = None,
+    cache_tags=(),
+) -> pd.DataFrame:
+    """
+    Runs a query into a DataFrame. With cache_ttl (seconds) the result is
+    served from the process-wide result cache, keyed by schema, query text
+    (comments and whitespace aside), bound parameters and dtypes.
+    """
+    if params is not None and isinstance(query, str):
+        # bound parameters use the :name style, which needs a text() clause
+        query = text(query)
+    if cache_ttl is None:
+        return _read_sql_query(schema, query, params, dtypes)
+
+    start = time.perf_counter()
+    key, tags = _cache_entry(schema, query, params, dtypes, cache_tags)
+    missed = []
+
+    def _load():
+        missed.append(True)
+        return _read_sql_query(schema, query, params, dtypes)
+
+    df = get_result_cache().get_or_set(key, _load, ttl=cache_ttl, tags=tags)
+    if not missed:
+        _record_cache_hit(schema, query, df, start)
+    # callers modify their frames (sort in place...), the cached one stays intact
+    return df.copy()
+
+
+def _cache_entry(schema: str, query, params, dtypes, cache_tags) -> tuple:
+    """
+    Result cache key and tags of a query.
+    """
+    key = (schema, canonical_sql(query), _freeze(params or {}), _freeze(dtypes))
+    tags = [f"schema={schema}", *cache_tags]
+    tags += [f"table={table}" for table in referenced_tables(query)]
+    return key, tags
+
+
+def _record_cache_hit(schema: str, query, df: pd.DataFrame, start: float) -> None:
+    get_query_log().record(
+        schema=schema,
+        fingerprint=fingerprint(query),
+        page=_current_page.get() or calling_page(PROJECT_PATH),
+        cache="hit",
+        rows=len(df),
+        total_ms=round((time.perf_counter() - start) * 1000, 2),
+    )
+
+
+async def aread_sql_query(
+    schema: str,
+    query: str | TextClause,
+    params: dict | None = None,
+    dtypes: dict | str | None = None,
+    cache_ttl: float | None = None,
+    cache_tags=(),
+) -> pd.DataFrame:
+    """
+    Async counterpart of read_sql_query on the async engine, sharing its query
+    log and result cache. Await it on the db_utils loop (run_async, gather).
+    """
+    if params is not None and isinstance(query, str):
+        query = text(query)
+    start = time.perf_counter()
+    if cache_ttl is not None:
+        key, tags = _cache_entry(schema, query, params, dtypes, cache_tags)
+        df = get_result_cache().get(key)
+        if df is not None:
+            _record_cache_hit(schema, query, df, start)
+            return df.copy()
+
+    async with get_async_engine(schema).connect() as con:
+        record = _new_record(schema, query, time.perf_counter() - start)
+        step = time.perf_counter()
+        try:
+            if isinstance(query, str):
+                result = await con.exec_driver_sql(query)
+            else:
+                result = await con.execute(query, params or {})
+            record["execute_ms"] = round((time.perf_counter() - step) * 1000, 2)
+            df = _build_frame(record, result, dtypes)
+        except Exception as e:
+            record["error"] = str(e)
+            get_query_log().record(**record)
+            raise
+
+    if cache_ttl is not None:
+        get_result_cache().set(key, df, ttl=cache_ttl, tags=tags)
+        return df.copy()
     return df
 
 
-def read_multiple_tables(schema: str, table_names: list) -> dict:
+def _read_sql_query(schema: str, query, params, dtypes) -> pd.DataFrame:
+    start = time.perf_counter()
+    with get_connection(schema) as con:
+        return _timed_read(
+            schema,
+            con,
+            query,
+            params,
+            connect_s=time.perf_counter() - start,
+            dtypes=dtypes,
+        )
+
+
+def stream_table(
+    schema: str, table_name: str, chunksize: int = STREAM_CHUNKSIZE, arrow: bool = False
+):
+    """
+    Streaming counterpart of read_table, see stream_sql_query.
+    """
+    logger.info(f"Streaming table {table_name} from schema {schema}")
+    yield from stream_sql_query(
+        schema, f"SELECT * FROM {table_name}", chunksize=chunksize, arrow=arrow
+    )
+
+
+def _read_table_task(schema: str, table_name: str) -> pd.DataFrame:
+    with get_connection(schema) as con:
+        df = pd.read_sql_table(table_name, con=con)
+    logger.info(f"Table {table_name} read successfully, shape: {df.shape}")
+    return df
+
+
+def read_multiple_tables(
+    schema: str,
+    table_names: list,
+    max_workers: int | None = None,
+    timeout: float | None = None,
+    errors: dict | None = None,
+) -> dict:
+    """
+    Reads tables in parallel, one pooled connection each (see run_parallel
+    for max_workers, timeout and errors).
+    """
     logger.info(f"Reading tables {table_names} from schema {schema}")
-    connection = create_engine(f"{DB_URL}{schema}")
-    tables = {}
-    for table_name in table_names:
-        tables[table_name] = pd.read_sql_table(table_name, con=connection)
-        logger.info(
-            f"Table {table_name} read successfully, shape: {tables[table_name].shape}"
+    tasks = {name: partial(_read_table_task, schema, name) for name in table_names}
+    return run_parallel(tasks, _db_workers(schema, max_workers), timeout, errors)
+
+
+def _read_query_task(schema: str, query, page: str | None) -> pd.DataFrame:
+    start = time.perf_counter()
+    with get_connection(schema) as con:
+        return _timed_read(
+            schema, con, query, connect_s=time.perf_counter() - start, page=page
         )
-    connection.dispose()
-    return tables
 
 
-def read_multiple_sql_queries(schema: str, queries: dict) -> dict:
+def read_multiple_sql_queries(
+    schema: str,
+    queries: dict,
+    max_workers: int | None = None,
+    timeout: float | None = None,
+    errors: dict | None = None,
+) -> dict:
+    """
+    Runs queries in parallel, one pooled connection each (see run_parallel
+    for max_workers, timeout and errors).
+    """
     logger.info(f"Reading tables {queries.keys()} from schema {schema}")
-    connection = create_engine(f"{DB_URL}{schema}")
-    tables = {}
-    for table_name, query in queries.items():
-        tables[table_name] = pd.read_sql_query(query, con=connection)
-        logger.info(
-            f"Table {table_name} read successfully, shape: {tables[table_name].shape}"
+    page = calling_page(PROJECT_PATH)
+    tasks = {
+        name: partial(_read_query_task, schema, query, page)
+        for name, query in queries.items()
+    }
+    return run_parallel(tasks, _db_workers(schema, max_workers), timeout, errors)
+
+
+def _bulk_load_options() -> dict:
+    options = dict(BULK_LOAD_DEFAULTS)
+    try:
+        options.update(dict(st.secrets.get("db_bulk_load", {})))
+    except Exception:
+        logger.exception("Invalid db_bulk_load secrets, using defaults")
+    return options
+
+
+def _sql_values(df: pd.DataFrame) -> list:
+    """
+    Rows of df as tuples of Python values, NaN / NaT as None.
+    """
+    columns = []
+    for col in df.columns:
+        if pd.api.types.is_datetime64_dtype(df[col]):
+            # drivers bind datetime, not pd.Timestamp (NaT becomes None)
+            columns.append(df[col].to_numpy().astype("datetime64[us]").tolist())
+        else:
+            values = df[col].astype(object)
+            columns.append(values.where(values.notna(), None).tolist())
+    return list(zip(*columns))
+
+
+def _quoted_columns(con, df: pd.DataFrame) -> list:
+    quote = con.dialect.identifier_preparer.quote
+    return [quote(str(c)) for c in df.columns]
+
+
+def _to_tsv(df: pd.DataFrame) -> str:
+    """
+    Renders df in the default LOAD DATA format: tab separated, backslash
+    escaped, \\N for NULL.
+    """
+    fields = []
+    for col in df.columns:
+        values = df[col]
+        missing = values.isna()
+        if pd.api.types.is_bool_dtype(values):
+            text_values = values.astype("Int64").astype(str)
+        elif pd.api.types.is_datetime64_any_dtype(values):
+            text_values = values.dt.strftime("%Y-%m-%d %H:%M:%S.%f")
+        elif pd.api.types.is_numeric_dtype(values):
+            text_values = values.astype(str)
+        else:
+            text_values = (
+                values.astype(str)
+                .str.replace("\\", "\\\\", regex=False)
+                .str.replace("\t", "\\t", regex=False)
+                .str.replace("\n", "\\n", regex=False)
+                .str.replace("\r", "\\r", regex=False)
+            )
+        fields.append(text_values.where(~missing, "\\N"))
+    if not fields:
+        return ""
+    lines = fields[0].str.cat(fields[1:], sep="\t") if len(fields) > 1 else fields[0]
+    return "\n".join(lines) + "\n"
+
+
+def _load_data_infile(con, table_name: str, df: pd.DataFrame) -> None:
+    with tempfile.NamedTemporaryFile(
+        "w", suffix=".tsv", encoding="utf-8", delete=False
+    ) as f:
+        f.write(_to_tsv(df))
+    try:
+        cols = ", ".join(_quoted_columns(con, df))
+        con.exec_driver_sql(
+            f"LOAD DATA LOCAL INFILE '{f.name}' INTO TABLE {table_name} "
+            f"CHARACTER SET utf8mb4 ({cols})"
+        )
+    finally:
+        os.remove(f.name)
+
+
+def _executemany_insert(con, table_name: str, df: pd.DataFrame, batch_size: int):
+    # the reflected table applies the same type processing as to_sql
+    table = sqlalchemy.Table(table_name, sqlalchemy.MetaData(), autoload_with=con)
+    columns = [str(c) for c in df.columns]
+    unknown = set(columns) - set(table.c.keys())
+    if unknown:
+        raise ValueError(f"Unknown columns in table {table_name}: {sorted(unknown)}")
+    rows = _sql_values(df)
+    for start in range(0, len(rows), batch_size):
+        con.execute(
+            table.insert(),
+            [dict(zip(columns, row)) for row in rows[start : start + batch_size]],
         )
-    connection.dispose()
-    return tables
+
+
+def _bulk_insert(
+    con, table_name: str, df: pd.DataFrame, method: str, batch_size: int
+) -> str:
+    """
+    Appends df to an existing table and returns the method used. "auto" uses
+    LOAD DATA LOCAL INFILE on MySQL when local_infile is enabled in the
+    [db_bulk_load] secrets, falling back to executemany, then to to_sql.
+    """
+    if method == "auto":
+        methods = ["executemany", "to_sql"]
+        if con.dialect.name == "mysql" and _bulk_load_options()["local_infile"]:
+            methods.insert(0, "load_data")
+    else:
+        methods = [method]
+    for i, name in enumerate(methods):
+        try:
+            # a savepoint lets a failed method fall back without losing the transaction
+            with con.begin_nested():
+                if name == "load_data":
+                    _load_data_infile(con, table_name, df)
+                elif name == "executemany":
+                    _executemany_insert(con, table_name, df, batch_size)
+                else:
+                    df.to_sql(
+                        table_name,
+                        con=con,
+                        if_exists="append",
+                        index=False,
+                        chunksize=1000,
+                        method="multi",
+                    )
+            return name
+        except Exception as e:
+            if i == len(methods) - 1:
+                raise
+            logger.error(f"Bulk insert with {name} failed, falling back: {e}")
 
 
 def create_sql_table(
@@ -73,24 +884,38 @@ def create_sql_table(
     table_name: str,
     df: pd.DataFrame,
     use_default_spec: bool = True,
+    method: str = "auto",
+    batch_size: int | None = None,
 ) -> None:
+    """
+    (Re)creates a table from df, with the sqlcol types by default. The schema
+    comes from the whole frame like to_sql, the rows go through _bulk_insert.
+    """
     logger.info(f"Creating table {table_name} in schema {schema}")
     if use_default_spec:
         outputdict = sqlcol(df)
     else:
         outputdict = None
-    connection = create_engine(f"{DB_URL}{schema}")
-    df.to_sql(
-        table_name,
-        con=connection,
-        if_exists="replace",
-        index=False,
-        chunksize=2000,
-        method="multi",
-        dtype=outputdict,
-    )
-    connection.dispose()
-    logger.info(f"Table {table_name} created successfully")
+    batch_size = batch_size or int(_bulk_load_options()["batch_size"])
+    with get_connection(schema, begin=True) as con:
+        if method == "to_sql":
+            df.to_sql(
+                table_name,
+                con=con,
+                if_exists="replace",
+                index=False,
+                chunksize=2000,
+                method="multi",
+                dtype=outputdict,
+            )
+        else:
+            con.execute(text(f"DROP TABLE IF EXISTS {table_name}"))
+            con.execute(
+                text(pd.io.sql.get_schema(df, table_name, con=con, dtype=outputdict))
+            )
+            method = _bulk_insert(con, table_name, df, method, batch_size)
+    _invalidate_table(table_name)
+    logger.info(f"Table {table_name} created successfully ({method})")
 
 
 def format_sql_table(format_function: callable, schema: str):
@@ -101,43 +926,215 @@ def insert_rows(
     schema: str,
     table_name: str,
     df: pd.DataFrame,
+    method: str = "auto",
+    batch_size: int | None = None,
 ) -> None:
+    """
+    Appends df to a table, see _bulk_insert for the methods.
+    """
     logger.info(f"Inserting rows into table {table_name} in schema {schema}")
-    connection = create_engine(f"{DB_URL}{schema}")
-    df.to_sql(
-        table_name,
-        con=connection,
-        if_exists="append",
-        index=False,
-        chunksize=1000,
-        method="multi",
+    batch_size = batch_size or int(_bulk_load_options()["batch_size"])
+    with get_connection(schema, begin=True) as con:
+        method = _bulk_insert(con, table_name, df, method, batch_size)
+    _invalidate_table(table_name)
+    logger.info(f"Rows inserted successfully ({method})")
+
+
+def _key_frame(keys: dict | pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalizes key tuples ({column: values} or a DataFrame of key columns)
+    into distinct rows of Python values that every driver can bind.
+    """
+    return pd.DataFrame(keys).drop_duplicates().astype(object)
+
+
+def _delete_keys(
+    con,
+    table_name: str,
+    keys: pd.DataFrame,
+    batch_size: int,
+    temp_table_threshold: int,
+) -> int:
+    columns = list(keys.columns)
+    rows = list(keys.itertuples(index=False, name=None))
+    if len(rows) <= temp_table_threshold:
+        # one DELETE ... WHERE (key columns) IN (...) per batch
+        table = sqlalchemy.table(table_name, *[sqlalchemy.column(c) for c in columns])
+        if len(columns) == 1:
+            key_expr = table.c[columns[0]]
+            rows = [row[0] for row in rows]
+        else:
+            key_expr = sqlalchemy.tuple_(*[table.c[c] for c in columns])
+        query = sqlalchemy.delete(table).where(
+            key_expr.in_(sqlalchemy.bindparam("keys", expanding=True))
+        )
+        deleted = 0
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start : start + batch_size]
+            deleted += con.execute(query, {"keys": batch}).rowcount
+        return deleted
+
+    # very large lists: load the keys into a temporary table and join on it
+    tmp = "_delete_keys"
+    drop = _load_temp_table(con, tmp, table_name, columns, rows, batch_size)
+    try:
+        cols = ", ".join(columns)
+        if con.dialect.name == "mysql":
+            on = " AND ".join(f"t.{c} = k.{c}" for c in columns)
+            query = f"DELETE t FROM {table_name} t JOIN {tmp} k ON {on}"
+        else:
+            query = (
+                f"DELETE FROM {table_name} WHERE ({cols}) IN (SELECT {cols} FROM {tmp})"
+            )
+        return con.execute(text(query)).rowcount
+    finally:
+        con.execute(drop)
+
+
+def _load_temp_table(
+    con, tmp: str, table_name: str, columns: list, rows: list, batch_size: int
+) -> TextClause:
+    """
+    Creates a temporary table with the types of table_name's columns, loads
+    rows into it batch_size at a time and returns the statement dropping it.
+    """
+    drop = text(
+        f"DROP TEMPORARY TABLE IF EXISTS {tmp}"
+        if con.dialect.name == "mysql"
+        else f"DROP TABLE IF EXISTS temp.{tmp}"
+    )
+    cols = ", ".join(columns)
+    con.execute(drop)
+    con.execute(
+        text(
+            f"CREATE TEMPORARY TABLE {tmp} AS SELECT {cols} FROM {table_name} WHERE 1 = 0"
+        )
+    )
+    insert = text(
+        f"INSERT INTO {tmp} ({cols}) VALUES "
+        f"({', '.join(f':c{i}' for i in range(len(columns)))})"
     )
-    connection.dispose()
-    logger.info("Rows inserted successfully")
+    for start in range(0, len(rows), batch_size):
+        con.execute(
+            insert,
+            [
+                {f"c{i}": value for i, value in enumerate(row)}
+                for row in rows[start : start + batch_size]
+            ],
+        )
+    return drop
 
 
-def delete_rows(schema: str, table_name: str, condition: str | list[str]) -> None:
-    engine = create_engine(f"{DB_URL}{schema}")
-    with engine.connect() as con:
-        if type(condition) is list:
+def delete_rows(
+    schema: str,
+    table_name: str,
+    condition: str | list[str] | None = None,
+    keys: dict | pd.DataFrame | None = None,
+    batch_size: int = DELETE_BATCH_SIZE,
+    temp_table_threshold: int = DELETE_TEMP_TABLE_THRESHOLD,
+) -> int:
+    """
+    Deletes the rows matching a condition, a list of conditions, or key tuples
+    given as {column: values} or a DataFrame of key columns. Lists and keys are
+    deleted batch_size at a time in a single transaction, through a temporary
+    table above temp_table_threshold keys. Returns the number of deleted rows.
+    """
+    deleted = 0
+    with get_connection(schema, begin=True) as con:
+        if keys is not None:
+            keys = _key_frame(keys)
+            logger.info(
+                f"Deleting {len(keys)} keys {list(keys.columns)} from table {table_name} in schema {schema}"
+            )
+            deleted = _delete_keys(
+                con, table_name, keys, batch_size, temp_table_threshold
+            )
+        elif type(condition) is list:
             logger.info(
                 f"Deleting {len(condition)} rows from table {table_name} in schema {schema}"
             )
-            cpt = 0
-            for cond in tqdm(condition):
-                con.execute(text(f"DELETE FROM {table_name} WHERE {cond}"))
-                cpt += 1
-                if cpt % 100 == 0:
-                    con.commit()
+            for start in range(0, len(condition), batch_size):
+                where = " OR ".join(
+                    f"({cond})" for cond in condition[start : start + batch_size]
+                )
+                deleted += con.execute(
+                    text(f"DELETE FROM {table_name} WHERE {where}")
+                ).rowcount
         else:
             logger.info(
                 f"Deleting row where {condition} from table {table_name} in schema {schema}"
             )
-            con.execute(text(f"DELETE FROM {table_name} WHERE {condition}"))
-        # commtting the changes
-        con.commit()
-    engine.dispose()
-    logger.info("Rows deleted successfully")
+            deleted = con.execute(
+                text(f"DELETE FROM {table_name} WHERE {condition}")
+            ).rowcount
+    _invalidate_table(table_name)
+    logger.info(f"{deleted} rows deleted successfully")
+    return deleted
+
+
+def update_rows(
+    schema: str,
+    table_name: str,
+    df: pd.DataFrame,
+    key_columns: list,
+    batch_size: int = UPDATE_BATCH_SIZE,
+    staging_threshold: int = UPDATE_STAGING_THRESHOLD,
+    commit_every_batch: bool = False,
+) -> int:
+    """
+    Sets the non-key columns of df on the rows matching its key_columns, with
+    bound parameters (no hand-built SQL). Rows go batch_size at a time through
+    executemany, or above staging_threshold rows into a temporary table joined
+    by one UPDATE. Everything runs in one transaction unless commit_every_batch.
+    Returns the number of affected rows.
+    """
+    value_columns = [c for c in df.columns if c not in key_columns]
+    if df.empty or not value_columns:
+        logger.error("No rows or no columns to update")
+        return 0
+    columns = list(key_columns) + value_columns
+    # NaN / NaT become NULL
+    rows = _sql_values(df[columns])
+    logger.info(
+        f"Updating {len(rows)} rows ({value_columns}) of table {table_name} in schema {schema}"
+    )
+
+    updated = 0
+    with get_connection(schema, begin=not commit_every_batch) as con:
+        if len(rows) <= staging_threshold:
+            sets = ", ".join(
+                f"{c} = :c{i}" for i, c in enumerate(columns) if c in value_columns
+            )
+            where = " AND ".join(f"{c} = :c{i}" for i, c in enumerate(key_columns))
+            query = text(f"UPDATE {table_name} SET {sets} WHERE {where}")
+            for start in range(0, len(rows), batch_size):
+                batch = [
+                    {f"c{i}": value for i, value in enumerate(row)}
+                    for row in rows[start : start + batch_size]
+                ]
+                updated += con.execute(query, batch).rowcount
+                if commit_every_batch:
+                    con.commit()
+        else:
+            tmp = "_update_rows"
+            drop = _load_temp_table(con, tmp, table_name, columns, rows, batch_size)
+            try:
+                if con.dialect.name == "mysql":
+                    on = " AND ".join(f"t.{c} = s.{c}" for c in key_columns)
+                    sets = ", ".join(f"t.{c} = s.{c}" for c in value_columns)
+                    query = f"UPDATE {table_name} t JOIN {tmp} s ON {on} SET {sets}"
+                else:
+                    on = " AND ".join(f"{table_name}.{c} = s.{c}" for c in key_columns)
+                    sets = ", ".join(f"{c} = s.{c}" for c in value_columns)
+                    query = f"UPDATE {table_name} SET {sets} FROM {tmp} s WHERE {on}"
+                updated = con.execute(text(query)).rowcount
+            finally:
+                con.execute(drop)
+            if commit_every_batch:
+                con.commit()
+    _invalidate_table(table_name)
+    logger.info(f"{updated} rows updated successfully")
+    return updated
 
 
 def execute_query(schema: str, query: str | list[str], verbose=False) -> bool:
@@ -146,9 +1143,8 @@ def execute_query(schema: str, query: str | list[str], verbose=False) -> bool:
     else:
         logger.setLevel(logging.ERROR)
     logger.info(f"Executing query in schema {schema}")
-    connection = create_engine(f"{DB_URL}{schema}")
     try:
-        with connection.connect() as con:
+        with get_connection(schema) as con:
             if type(query) is list:
                 cpt = 0
                 # for q in query:
@@ -164,7 +1160,11 @@ def execute_query(schema: str, query: str | list[str], verbose=False) -> bool:
     except Exception as e:
         logger.error(e)
         return False
-    connection.dispose()
+    finally:
+        # earlier batches may be committed even when a later statement fails
+        queries = query if type(query) is list else [query]
+        for table in set().union(*(referenced_tables(q) for q in queries)):
+            _invalidate_table(table)
     logger.info("Query executed successfully")
     return True
 
@@ -230,14 +1230,13 @@ def sqlcol(dfparam):
 
 def drop_table(schema: str, table_name: str) -> None:
     logger.info(f"Dropping table {table_name} in schema {schema}")
-    connection = create_engine(f"{DB_URL}{schema}")
     try:
-        with connection.connect() as con:
+        with get_connection(schema) as con:
             query = f"DROP TABLE {table_name}"
             con.execute(text(query))
             con.commit()
     except Exception as e:
         logger.error(e)
         return False
-    connection.dispose()
+    _invalidate_table(table_name)
     logger.info(f"Table {table_name} dropped successfully")
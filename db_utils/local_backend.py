@@ -0,0 +1,519 @@
+"""
+Local stand-in for the MySQL databases, so the app can be profiled and
+regression-tested offline.
+
+Each schema (TeNNet, FootNet) is one SQLite file named after it in a
+directory; point the app at that directory in .streamlit/secrets.toml:
+
+    db_url = "sqlite:////path/to/dir/"
+
+and fill it with seeded synthetic data:
+
+    python db_utils/local_backend.py /path/to/dir --users 20 --years 3
+
+get_engine registers on_connect on SQLite engines, which adds the MySQL
+functions the queries use and attaches the sibling schemas so qualified
+names like FootNet.Users resolve. --backend duckdb writes the same tables to
+DuckDB files, for analysis outside the app.
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+LOCAL_BACKENDS = ("sqlite", "duckdb")
+
+# Portable DDL (SQLite and DuckDB), with the indexes the loaders join on
+SCHEMA_DDL = {
+    "TeNNet": {
+        "Bet": """CREATE TABLE Bet (
+            ID_BET INTEGER PRIMARY KEY,
+            ID_USER INTEGER NOT NULL,
+            ID_MATCH VARCHAR(32) NOT NULL,
+            ID_MARKET VARCHAR(32),
+            ID_REF VARCHAR(32),
+            type VARCHAR(32),
+            bet INTEGER,
+            bet_libelle VARCHAR(128),
+            odds DOUBLE,
+            stake DOUBLE,
+            status VARCHAR(16)
+        )""",
+        "men_matchs": """CREATE TABLE men_matchs (
+            ID_MATCH VARCHAR(32) PRIMARY KEY,
+            tourney_name VARCHAR(64),
+            tourney_level VARCHAR(4),
+            winner_name VARCHAR(64),
+            loser_name VARCHAR(64),
+            round VARCHAR(8),
+            surface VARCHAR(16),
+            match_settled INTEGER,
+            score VARCHAR(64),
+            tourney_date DATETIME
+        )""",
+        "women_matchs": """CREATE TABLE women_matchs (
+            ID_MATCH VARCHAR(32) PRIMARY KEY,
+            tourney_name VARCHAR(64),
+            tourney_level VARCHAR(4),
+            winner_name VARCHAR(64),
+            loser_name VARCHAR(64),
+            round VARCHAR(8),
+            surface VARCHAR(16),
+            match_settled INTEGER,
+            score VARCHAR(64),
+            tourney_date DATETIME
+        )""",
+        "double_matchs": """CREATE TABLE double_matchs (
+            ID_MATCH VARCHAR(32) PRIMARY KEY,
+            tourney_name VARCHAR(64),
+            tourney_level VARCHAR(4),
+            winner_name1 VARCHAR(64),
+            winner_name2 VARCHAR(64),
+            loser_name1 VARCHAR(64),
+            loser_name2 VARCHAR(64),
+            round VARCHAR(8),
+            surface VARCHAR(16),
+            match_settled INTEGER,
+            score VARCHAR(64),
+            tourney_date DATETIME
+        )""",
+        "predictions": """CREATE TABLE predictions (
+            ID_MATCH VARCHAR(32) PRIMARY KEY,
+            winner_pred DOUBLE,
+            loser_pred DOUBLE
+        )""",
+        "odds": """CREATE TABLE odds (
+            id VARCHAR(32) PRIMARY KEY,
+            liens VARCHAR(255),
+            MaxW DOUBLE,
+            MaxL DOUBLE
+        )""",
+    },
+    "FootNet": {
+        "Users": """CREATE TABLE Users (
+            ID_USER INTEGER PRIMARY KEY,
+            username VARCHAR(64),
+            password_st VARCHAR(64),
+            bankroll DOUBLE
+        )""",
+    },
+}
+SCHEMA_INDEXES = {
+    "TeNNet": [
+        "CREATE INDEX idx_bet_user ON Bet (ID_USER)",
+        "CREATE INDEX idx_bet_match ON Bet (ID_MATCH)",
+        "CREATE INDEX idx_men_settled ON men_matchs (match_settled, tourney_date)",
+        "CREATE INDEX idx_women_settled ON women_matchs (match_settled, tourney_date)",
+        "CREATE INDEX idx_double_settled ON double_matchs (match_settled, tourney_date)",
+    ],
+    "FootNet": [],
+}
+
+GENERATOR_DEFAULTS = {
+    "n_users": 20,
+    "years": 2,
+    "matches_per_year": 20_000,
+    "bets_per_match": 0.5,
+    "future_days": 7,
+    "seed": 0,
+}
+
+# (competition table, share of the matches, tournaments as (name, level, surface))
+COMPETITIONS = [
+    (
+        "men_matchs",
+        0.45,
+        [
+            ("Australian Open", "G", "Hard"),
+            ("Roland Garros", "G", "Clay"),
+            ("Wimbledon", "G", "Grass"),
+            ("US Open", "G", "Hard"),
+            ("Indian Wells Masters", "M", "Hard"),
+            ("Monte Carlo Masters", "M", "Clay"),
+            ("Paris Masters", "M", "Hard"),
+            ("Rotterdam", "A", "Hard"),
+            ("Halle", "A", "Grass"),
+            ("Umag", "A", "Clay"),
+            ("Bergamo CH", "C", "Hard"),
+            ("Santiago CH", "C", "Clay"),
+        ],
+    ),
+    (
+        "women_matchs",
+        0.40,
+        [
+            ("Australian Open", "G", "Hard"),
+            ("Roland Garros", "G", "Clay"),
+            ("Wimbledon", "G", "Grass"),
+            ("US Open", "G", "Hard"),
+            ("Miami", "PM", "Hard"),
+            ("Madrid", "PM", "Clay"),
+            ("Stuttgart", "P", "Clay"),
+            ("Eastbourne", "P", "Grass"),
+            ("Hobart", "I", "Hard"),
+            ("Bogota", "I", "Clay"),
+        ],
+    ),
+    (
+        "double_matchs",
+        0.15,
+        [
+            ("Australian Open", "G", "Hard"),
+            ("Wimbledon", "G", "Grass"),
+            ("Monte Carlo Masters", "M", "Clay"),
+            ("Rotterdam", "A", "Hard"),
+            ("Bergamo CH", "C", "Hard"),
+        ],
+    ),
+]
+ROUNDS = ["R128", "R64", "R32", "R16", "QF", "SF", "F", "RR", "Q1", "Q2"]
+ROUND_WEIGHTS = [0.22, 0.2, 0.18, 0.12, 0.08, 0.05, 0.03, 0.02, 0.06, 0.04]
+
+LAST_NAMES = [
+    "Alcaraz", "Sinner", "Zverev", "Medvedev", "Rune", "Ruud", "Fritz", "Paul",
+    "Draper", "De Minaur", "Shelton", "Tiafoe", "Humbert", "Fils", "Mensik",
+    "Swiatek", "Sabalenka", "Gauff", "Rybakina", "Pegula", "Paolini", "Zheng",
+    "Andreeva", "Keys", "Navarro", "Badosa", "Mertens", "Garcia", "Ostapenko",
+    "O'Connell", "Martinez", "Cerundolo", "Diaz Acosta", "Muller", "Moutet",
+]  # fmt: skip
+SCORE_POOL_SIZE = 4000
+
+
+def _players(rng: np.random.Generator, n: int) -> np.ndarray:
+    """
+    Pool of distinct player names ("Sinner J.", "Sinner J.2", ...).
+    """
+    initials = np.array(list("ABCDEFGHIJKLMNOPRSTVZ"))
+    names = [f"{rng.choice(LAST_NAMES)} {rng.choice(initials)}." for _ in range(n)]
+    seen = {}
+    for i, name in enumerate(names):
+        seen[name] = seen.get(name, 0) + 1
+        if seen[name] > 1:
+            names[i] = f"{name}{seen[name]}"
+    return np.array(names, dtype=object)
+
+
+def _set_score(rnd: random.Random, winner_first: bool) -> str:
+    kind = rnd.random()
+    if kind < 0.78:
+        a, b = 6, rnd.randint(0, 4)
+        text = f"{a}-{b}"
+    elif kind < 0.88:
+        text = "7-5"
+    else:
+        text = f"7-6({rnd.randint(0, 10)})"
+    if winner_first:
+        return text
+    a, b = text[:3].split("-")
+    return f"{b}-{a}" + text[3:]
+
+
+def _match_score(rnd: random.Random, best_of: int) -> str:
+    """
+    Score from the winner's point of view, with occasional retirements (RET),
+    walkovers (W/O) and abandoned matches (ABD).
+    """
+    roll = rnd.random()
+    if roll < 0.01:
+        return "W/O"
+    to_win = best_of // 2 + 1
+    # the winner takes the last set, the others are shuffled
+    sets = [True] * (to_win - 1) + [False] * rnd.randint(0, to_win - 1)
+    rnd.shuffle(sets)
+    tokens = [_set_score(rnd, won) for won in sets + [True]]
+    if roll < 0.05:
+        # retirement or abandon during a set, possibly before any completed set
+        cut = rnd.randint(0, len(tokens) - 1)
+        partial = f"{rnd.randint(0, 5)}-{rnd.randint(0, 5)}"
+        marker = "ABD" if roll < 0.015 else "RET"
+        tokens = tokens[:cut] + [partial, marker]
+    return " ".join(tokens)
+
+
+def _score_pool(rnd: random.Random, best_of: int) -> np.ndarray:
+    return np.array(
+        [_match_score(rnd, best_of) for _ in range(SCORE_POOL_SIZE)], dtype=object
+    )
+
+
+def generate(
+    n_users: int = GENERATOR_DEFAULTS["n_users"],
+    years: float = GENERATOR_DEFAULTS["years"],
+    matches_per_year: int = GENERATOR_DEFAULTS["matches_per_year"],
+    bets_per_match: float = GENERATOR_DEFAULTS["bets_per_match"],
+    future_days: int = GENERATOR_DEFAULTS["future_days"],
+    seed: int = GENERATOR_DEFAULTS["seed"],
+    end=None,
+) -> dict:
+    """
+    Builds seeded synthetic tables as {schema: {table: DataFrame}}.
+    Matches span `years` up to `end` (now by default) and are settled, plus
+    `future_days` of unsettled matches; every match gets a Poisson number of
+    bets with mean `bets_per_match`, spread over the users.
+    """
+    rng = np.random.default_rng(seed)
+    rnd = random.Random(seed)
+    end = pd.Timestamp(end or pd.Timestamp.now()).floor("min")
+    start = end - pd.Timedelta(days=round(365 * years))
+    n_past = int(matches_per_year * years)
+    n_future = int(matches_per_year * future_days / 365)
+    n_matches = n_past + n_future
+
+    offsets = np.concatenate(
+        [
+            rng.integers(0, int((end - start).total_seconds() // 60), n_past),
+            rng.integers(1, future_days * 24 * 60 + 1, n_future)
+            + int((end - start).total_seconds() // 60),
+        ]
+    )
+    dates = start + pd.to_timedelta(offsets, unit="min")
+    settled = np.concatenate(
+        [rng.choice([1, 2], n_past, p=[0.65, 0.35]), np.zeros(n_future, dtype=int)]
+    )
+    table_idx = rng.choice(
+        len(COMPETITIONS), n_matches, p=[share for _, share, _ in COMPETITIONS]
+    )
+    match_ids = np.array([f"{10_000_000 + i}" for i in range(n_matches)], dtype=object)
+
+    # fair win probability of the winner_name side, predictions and best odds
+    proba = rng.beta(4, 3, n_matches).clip(0.04, 0.96)
+    winner_pred = (1 / proba).round(3)
+    loser_pred = (1 / (1 - proba)).round(3)
+    max_w = (winner_pred * rng.normal(1.0, 0.08, n_matches)).clip(1.01).round(2)
+    max_l = (loser_pred * rng.normal(1.0, 0.08, n_matches)).clip(1.01).round(2)
+    has_link = rng.random(n_matches) < 0.7
+    odds = pd.DataFrame(
+        {
+            "id": match_ids,
+            "liens": np.where(
+                has_link,
+                "https://www.oddsportal.com/tennis/match/" + match_ids,
+                None,
+            ),
+            "MaxW": max_w,
+            "MaxL": max_l,
+        }
+    )
+    predictions = pd.DataFrame(
+        {"ID_MATCH": match_ids, "winner_pred": winner_pred, "loser_pred": loser_pred}
+    )
+
+    singles_pool = _players(rng, 600)
+    rounds = rng.choice(ROUNDS, n_matches, p=ROUND_WEIGHTS)
+    tables = {}
+    for i, (table, _, tournaments) in enumerate(COMPETITIONS):
+        idx = np.flatnonzero(table_idx == i)
+        n = len(idx)
+        tourney = rng.integers(0, len(tournaments), n)
+        names, levels, surfaces = (
+            np.array(col, dtype=object) for col in zip(*tournaments)
+        )
+        best_of_5 = (table == "men_matchs") & (levels[tourney] == "G")
+        pool3, pool5 = _score_pool(rnd, 3), _score_pool(rnd, 5)
+        scores = np.where(
+            best_of_5,
+            pool5[rng.integers(0, SCORE_POOL_SIZE, n)],
+            pool3[rng.integers(0, SCORE_POOL_SIZE, n)],
+        )
+        frame = pd.DataFrame(
+            {
+                "ID_MATCH": match_ids[idx],
+                "tourney_name": names[tourney],
+                "tourney_level": levels[tourney],
+            }
+        )
+        if table == "double_matchs":
+            for side in ("winner_name1", "winner_name2", "loser_name1", "loser_name2"):
+                frame[side] = singles_pool[rng.integers(0, len(singles_pool), n)]
+        else:
+            pair = rng.choice(len(singles_pool), (n, 2))
+            pair[:, 1] = (pair[:, 0] + 1 + pair[:, 1] % (len(singles_pool) - 1)) % len(
+                singles_pool
+            )
+            frame["winner_name"] = singles_pool[pair[:, 0]]
+            frame["loser_name"] = singles_pool[pair[:, 1]]
+        frame["round"] = rounds[idx]
+        frame["surface"] = surfaces[tourney]
+        frame["match_settled"] = settled[idx]
+        frame["score"] = np.where(settled[idx] == 0, None, scores)
+        frame["tourney_date"] = dates[idx]
+        tables[table] = frame
+
+    # bets: Poisson count per match, on the side with the better edge mostly
+    n_bets = rng.poisson(bets_per_match, n_matches)
+    bet_match = np.repeat(np.arange(n_matches), n_bets)
+    total = len(bet_match)
+    value_side = (max_w / winner_pred >= max_l / loser_pred).astype(int)
+    side = np.where(
+        rng.random(total) < 0.8, value_side[bet_match], rng.integers(0, 2, total)
+    )
+    side_odds = np.where(side == 1, max_w[bet_match], max_l[bet_match])
+    bets = pd.DataFrame(
+        {
+            "ID_BET": np.arange(1, total + 1),
+            "ID_USER": rng.integers(1, n_users + 1, total),
+            "ID_MATCH": match_ids[bet_match],
+            "ID_MARKET": np.char.add(
+                "1.", rng.integers(200_000_000, 260_000_000, total).astype(str)
+            ),
+            "ID_REF": rng.integers(10_000, 99_999_999, total).astype(str),
+            "type": np.where(rng.random(total) < 0.9, "BACK", "LAY"),
+            "bet": side,
+            "bet_libelle": np.where(side == 1, "winner", "loser"),
+            "odds": (side_odds * rng.normal(1.0, 0.03, total)).clip(1.01).round(2),
+            "stake": rng.choice([2.0, 5.0, 10.0, 20.0, 50.0], total),
+            "status": np.where(settled[bet_match] == 0, "EXECUTABLE", "SETTLED"),
+        }
+    )
+    users = pd.DataFrame(
+        {
+            "ID_USER": np.arange(1, n_users + 1),
+            "username": [f"user{u}" for u in range(1, n_users + 1)],
+            # the password of each user is its username
+            "password_st": [
+                hashlib.md5(f"user{u}".encode()).hexdigest()
+                for u in range(1, n_users + 1)
+            ],
+            "bankroll": rng.integers(200, 20_000, n_users).astype(float),
+        }
+    )
+    return {
+        "TeNNet": {
+            "Bet": bets,
+            **tables,
+            "predictions": predictions,
+            "odds": odds,
+        },
+        "FootNet": {"Users": users},
+    }
+
+
+def _write_sqlite(path: str, schema: str, frames: dict) -> None:
+    con = sqlite3.connect(path)
+    try:
+        for table, ddl in SCHEMA_DDL[schema].items():
+            con.execute(ddl)
+            frame = frames[table]
+            for col in frame.select_dtypes("datetime").columns:
+                frame = frame.assign(
+                    **{col: frame[col].dt.strftime("%Y-%m-%d %H:%M:%S")}
+                )
+            placeholders = ",".join("?" * len(frame.columns))
+            con.executemany(
+                f"INSERT INTO {table} ({','.join(frame.columns)}) VALUES ({placeholders})",
+                frame.astype(object)
+                .where(frame.notna(), None)
+                .itertuples(index=False, name=None),
+            )
+        for statement in SCHEMA_INDEXES[schema]:
+            con.execute(statement)
+        con.commit()
+    finally:
+        con.close()
+
+
+def _write_duckdb(path: str, schema: str, frames: dict) -> None:
+    import duckdb
+
+    con = duckdb.connect(path)
+    try:
+        for table, ddl in SCHEMA_DDL[schema].items():
+            con.execute(ddl)
+            con.register("_frame", frames[table])
+            con.execute(f"INSERT INTO {table} SELECT * FROM _frame")
+            con.unregister("_frame")
+        for statement in SCHEMA_INDEXES[schema]:
+            con.execute(statement)
+    finally:
+        con.close()
+
+
+def write_database(directory: str, frames: dict, backend: str = "sqlite") -> dict:
+    """
+    Writes generated tables to one file per schema in directory, replacing
+    existing files. Returns the row count of every table.
+    """
+    if backend not in LOCAL_BACKENDS:
+        raise ValueError(
+            f"Unknown local backend {backend!r}, expected {LOCAL_BACKENDS}"
+        )
+    os.makedirs(directory, exist_ok=True)
+    writer = _write_sqlite if backend == "sqlite" else _write_duckdb
+    counts = {}
+    for schema, tables in frames.items():
+        path = os.path.join(directory, schema)
+        if os.path.exists(path):
+            os.remove(path)
+        writer(path, schema, tables)
+        counts.update({f"{schema}.{table}": len(df) for table, df in tables.items()})
+    return counts
+
+
+def _concat(*args):
+    # MySQL CONCAT: NULL if any argument is NULL
+    if any(arg is None for arg in args):
+        return None
+    return "".join(str(arg) for arg in args)
+
+
+def on_connect(database: str, dbapi_con, connection_record=None) -> None:
+    """
+    Connect hook of the SQLite engines: registers the MySQL functions used by
+    the queries and attaches the schema files next to the database, the
+    database itself included, so schema-qualified names resolve everywhere.
+    """
+    directory = os.path.dirname(database)
+    dbapi_con.create_function("concat", -1, _concat)
+    cursor = dbapi_con.cursor()
+    try:
+        for schema in SCHEMA_DDL:
+            path = os.path.join(directory, schema)
+            if os.path.exists(path):
+                cursor.execute(f"ATTACH DATABASE '{path}' AS {schema}")
+    finally:
+        cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Creates local TeNNet/FootNet databases with synthetic data."
+    )
+    parser.add_argument("directory")
+    parser.add_argument("--backend", choices=LOCAL_BACKENDS, default="sqlite")
+    parser.add_argument("--users", type=int, default=GENERATOR_DEFAULTS["n_users"])
+    parser.add_argument("--years", type=float, default=GENERATOR_DEFAULTS["years"])
+    parser.add_argument(
+        "--matches-per-year", type=int, default=GENERATOR_DEFAULTS["matches_per_year"]
+    )
+    parser.add_argument(
+        "--bets-per-match", type=float, default=GENERATOR_DEFAULTS["bets_per_match"]
+    )
+    parser.add_argument(
+        "--future-days", type=int, default=GENERATOR_DEFAULTS["future_days"]
+    )
+    parser.add_argument("--seed", type=int, default=GENERATOR_DEFAULTS["seed"])
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    frames = generate(
+        n_users=args.users,
+        years=args.years,
+        matches_per_year=args.matches_per_year,
+        bets_per_match=args.bets_per_match,
+        future_days=args.future_days,
+        seed=args.seed,
+    )
+    counts = write_database(args.directory, frames, args.backend)
+    for table, count in counts.items():
+        print(f"{table}: {count} rows")
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from collections import deque
+from datetime import datetime
+
+logger = logging.getLogger("db_utils")
+
+COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+STRING_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+IN_LIST_RE = re.compile(r"\bin\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+SPACE_RE = re.compile(r"\s+")
+TABLE_RE = re.compile(r"\b(?:from|join|into|update)\s+`?([\w.]+)`?", re.IGNORECASE)
+
+
+def normalize_sql(query) -> str:
+    """
+    Reduces a query to its shape: comments removed, literals and bound
+    parameters replaced by ?, IN lists collapsed and whitespace squeezed.
+    """
+    sql = COMMENT_RE.sub(" ", str(query))
+    sql = STRING_RE.sub("?", sql)
+    sql = NUMBER_RE.sub("?", sql)
+    sql = re.sub(r"(?<!:):\w+|%\(\w+\)s|%s", "?", sql)
+    sql = IN_LIST_RE.sub("in (?)", sql)
+    return SPACE_RE.sub(" ", sql).strip().lower()
+
+
+def canonical_sql(query) -> str:
+    """
+    Query text with comments removed and whitespace squeezed outside of string
+    literals, which are kept as is. Unlike normalize_sql, distinct literal
+    values give distinct texts.
+    """
+    sql = str(query)
+    parts, last = [], 0
+    for match in STRING_RE.finditer(sql):
+        parts.append(SPACE_RE.sub(" ", COMMENT_RE.sub(" ", sql[last : match.start()])))
+        parts.append(match.group())
+        last = match.end()
+    parts.append(SPACE_RE.sub(" ", COMMENT_RE.sub(" ", sql[last:])))
+    return "".join(parts).strip()
+
+
+def referenced_tables(query) -> set:
+    """
+    Names of the tables a query reads or writes (FROM, JOIN, INTO, UPDATE),
+    without schema prefix.
+    """
+    tables = TABLE_RE.findall(STRING_RE.sub("?", str(query)))
+    return {table.split(".")[-1] for table in tables}
+
+
+def fingerprint(query) -> str:
+    """
+    Stable identifier of a query shape, identical for calls that only differ
+    by their literal or parameter values.
+    """
+    return hashlib.sha1(normalize_sql(query).encode()).hexdigest()[:12]
+
+
+def calling_page(project_path: str) -> str | None:
+    """
+    Returns the Streamlit script (app.py or pages/*.py) running the current
+    call, relative to the project root.
+    """
+    project_path = os.path.abspath(project_path)
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(project_path):
+            relative = os.path.relpath(filename, project_path)
+            if relative == "app.py" or relative.startswith("pages" + os.sep):
+                return relative
+        frame = frame.f_back
+    return None
+
+
+class QueryLog:
+    """
+    Thread-safe ring buffer of per-query records, optionally mirrored to a
+    JSON-lines file.
+    """
+
+    def __init__(self, max_records: int = 1000, path: str | None = None):
+        self.path = path
+        self._records = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+
+    def record(self, **fields) -> dict:
+        entry = {"ts": datetime.now().isoformat(timespec="milliseconds"), **fields}
+        with self._lock:
+            self._records.append(entry)
+            if self.path:
+                try:
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(entry, default=str) + "\n")
+                except OSError as e:
+                    logger.error(f"Could not write query log to {self.path}: {e}")
+        return entry
+
+    def records(self, last: int | None = None) -> list[dict]:
+        with self._lock:
+            records = list(self._records)
+        return records if last is None else records[-last:]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
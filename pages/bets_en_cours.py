@@ -1,5 +1,5 @@
 import streamlit as st
-from data import prepare_bets_data
+from data_access import get_inplay_bets
 
 st.set_page_config(
     layout="wide", page_icon="logo_TeNNet.png", page_title="Paris en cours"
@@ -197,7 +197,7 @@ def display_bet_cards(bets_df, cols_per_row=3):
 
 
 if st.session_state.get("logged_in", False):
-    bets_data = prepare_bets_data(st.session_state["ID_USER"], finished=False)
+    bets_data = get_inplay_bets(st.session_state["ID_USER"])
 
     if not bets_data.empty:
         # Calculate potential gains for all bets
@@ -0,0 +1,179 @@
+import html
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Card styles, emitted once per page: the cards only carry their values and
+# class names (hover effects and small animations, white stripe on hover)
+CARDS_CSS = """
+<style>
+.fnv-card {
+    position: relative;
+    overflow: hidden;
+    background: linear-gradient(180deg, rgba(18,20,24,0.95), rgba(23,25,30,0.9));
+    border-radius: 12px;
+    padding: 12px;
+    border: 1px solid rgba(255,255,255,0.03);
+    transition: transform 0.18s ease, box-shadow 0.18s ease, border-color 0.18s ease;
+    will-change: transform;
+    font-family: Segoe UI, Roboto, sans-serif;
+    color: #e6eef8;
+}
+/* animated white stripe (sheen) that moves across on hover */
+.fnv-card::before {
+    content: '';
+    position: absolute;
+    top: -60%;
+    left: -40%;
+    width: 180%;
+    height: 80%;
+    background: linear-gradient(90deg, rgba(255,255,255,0.0) 0%, rgba(255,255,255,0.18) 45%, rgba(255,255,255,0.06) 55%, rgba(255,255,255,0.0) 100%);
+    transform: rotate(-18deg) translateX(-20%);
+    opacity: 0;
+    transition: opacity 0.32s ease, transform 0.5s ease;
+    pointer-events: none;
+    mix-blend-mode: overlay;
+    border-radius: 40px;
+}
+/* subtle top highlight line */
+.fnv-card::after {
+    content: '';
+    position: absolute;
+    top: 0;
+    left: 0;
+    width: 100%;
+    height: 6px;
+    background: linear-gradient(90deg, rgba(255,255,255,0.08), rgba(255,255,255,0));
+    opacity: 0.9;
+    pointer-events: none;
+}
+.fnv-card:hover {
+    transform: translateY(-6px) scale(1.01);
+    box-shadow: 0 18px 40px rgba(2,6,23,0.65);
+    border-color: rgba(50,178,150,0.06);
+}
+.fnv-card:hover::before {
+    opacity: 1;
+    transform: rotate(-18deg) translateX(20%);
+}
+.fnv-wrap { padding: 6px; }
+.fnv-grid { display: grid; grid-template-columns: 1fr 120px; gap: 10px; align-items: center; }
+.fnv-title { font-size: 15px; font-weight: 700; color: #ffffff; white-space: nowrap; overflow: hidden; text-overflow: ellipsis; }
+.fnv-tags { color: #9ca3af; font-size: 12px; margin-top: 8px; display: flex; gap: 6px; flex-wrap: wrap; align-items: center; }
+.fnv-tag { background: rgba(255,255,255,0.03); padding: 5px 6px; border-radius: 6px; font-size: 12px; }
+.fnv-tourney { color: #9ca3af; font-size: 12px; margin-top: 8px; overflow: hidden; text-overflow: ellipsis; white-space: nowrap; }
+.fnv-time { font-size: 13px; color: #cbd5e1; font-weight: 700; }
+.fnv-links { margin-top: 8px; display: flex; gap: 6px; justify-content: flex-end; }
+.fnv-links a { text-decoration: none; }
+.fnv-ev {
+    transition: transform 0.12s ease, box-shadow 0.12s ease;
+    display: inline-block;
+    color: #ffffff;
+    padding: 5px 6px;
+    border-radius: 999px;
+    font-weight: 700;
+    font-size: 12px;
+}
+.fnv-ev:hover { transform: scale(1.06); box-shadow: 0 6px 14px rgba(0,0,0,0.25); }
+.fnv-ev-high { background: #6a0dad; }
+.fnv-ev-low { background: #ff8c00; }
+.fnv-ev-pos { background: #32b296; }
+.fnv-ev-neg { background: #e04e4e; }
+.fnv-btn {
+    transition: transform 0.12s ease;
+    display: inline-block;
+    color: #ffffff;
+    padding: 5px 8px;
+    border-radius: 6px;
+    font-weight: 700;
+    font-size: 12px;
+}
+.fnv-btn:hover { transform: translateY(-2px); }
+.fnv-btn-flash { background: #ff2d55; }
+.fnv-btn-odds { background: #0ea5a0; }
+</style>
+"""
+
+# One card per line and no blank line, so a whole expander is a single HTML
+# block for the markdown renderer
+CARD_TEMPLATE = (
+    "<div class='fnv-wrap'><div class='fnv-card'><div class='fnv-grid'>"
+    "<div style='min-width:0'>"
+    "<div class='fnv-title'>{match} — {player}</div>"
+    "<div class='fnv-tags'>"
+    "<span class='fnv-tag'>Prédiction: {pred}</span>"
+    "<span class='fnv-tag'>Cote: {odds}</span>"
+    "<span class='fnv-ev {ev_class}'>EV: {ev}%</span>"
+    "</div>"
+    "<div class='fnv-tourney'>Tournoi: {tourney}</div>"
+    "</div>"
+    "<div style='text-align:right'>"
+    "<div class='fnv-time'>{time}</div>"
+    "<div class='fnv-links'>"
+    "<a href='{flash_url}' target='_blank'><span class='fnv-btn fnv-btn-flash'>Flash</span></a>"
+    "<a href='{odds_url}' target='_blank'><span class='fnv-btn fnv-btn-odds'>Odds</span></a>"
+    "</div></div></div></div></div>"
+)
+
+
+def _escape(values: pd.Series) -> pd.Series:
+    return values.fillna("").astype(str).map(lambda v: html.escape(v, quote=False))
+
+
+def _attribute(values: pd.Series) -> pd.Series:
+    return values.fillna("#").astype(str).map(lambda v: html.escape(v, quote=True))
+
+
+def cards_html(rows: pd.DataFrame) -> str:
+    """
+    HTML of the recommended-bet cards of rows (opportunities with their
+    Heure and link columns), in one string.
+    """
+    ev = pd.to_numeric(rows["EV_pct"], errors="coerce").fillna(0.0).to_numpy()
+    fields = pd.DataFrame(
+        {
+            "match": _escape(rows["Match"]),
+            "player": _escape(rows["Joueur"]),
+            "pred": rows["Prédiction"].map("{:.3f}".format),
+            "odds": rows["Max_cote"].map("{:.3f}".format),
+            "ev": rows["EV_pct"].map("{:+.1f}".format),
+            # strong margin violet, very low orange, then green / red by sign
+            "ev_class": np.select(
+                [ev > 10, (ev > 0) & (ev < 2), ev > 0],
+                ["fnv-ev-high", "fnv-ev-low", "fnv-ev-pos"],
+                "fnv-ev-neg",
+            ),
+            "tourney": _escape(rows["Tournoi"]),
+            "time": _escape(rows["Heure"]),
+            "flash_url": _attribute(rows["Flash_URL"]),
+            "odds_url": _attribute(rows["Odds_URL"]),
+        }
+    )
+    return "\n".join(
+        CARD_TEMPLATE.format_map(card) for card in fields.to_dict("records")
+    )
+
+
+def render_opportunity_cards(recommended: pd.DataFrame) -> None:
+    """
+    Renders the recommended bets by competition (three columns) and tournament
+    (one expander each), with one markdown element per expander.
+    """
+    st.markdown(CARDS_CSS, unsafe_allow_html=True)
+
+    comps = recommended["Compétition"].fillna("Autre").astype(str)
+    tourneys = recommended["Tournoi"].fillna("Autre").astype(str)
+    # competitions and tournaments in order of first appearance
+    unique_comps = list(dict.fromkeys(comps))
+
+    cols = st.columns(3)
+    for i, comp in enumerate(unique_comps):
+        comp_rows = recommended[comps == comp]
+        comp_tourneys = tourneys[comps == comp]
+        with cols[i % 3]:
+            st.markdown(f"### {comp} ({len(comp_rows)})")
+            for tournoi in dict.fromkeys(comp_tourneys):
+                t_rows = comp_rows[comp_tourneys == tournoi]
+                with st.expander(f"{tournoi} ({len(t_rows)})", expanded=False):
+                    st.markdown(cards_html(t_rows), unsafe_allow_html=True)
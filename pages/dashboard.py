@@ -1,6 +1,6 @@
 import streamlit as st
 import pandas as pd
-from data import prepare_bets_data
+from data_access import get_bets, invalidate_user
 from pages.components.metrics import render_metrics
 from pages.components.charts import render_cumulative_chart
 from pages.components.match_card import render_match_info
@@ -59,27 +59,18 @@ chartOptions = {
 
 st.title("🏆 Les résultats TeNNet", text_alignment="center")
 
-# Cache bets data once per user in session_state to avoid repeated loads during reruns
+# Bets come from the shared data cache, reloaded incrementally when it expires
 if st.session_state.get("logged_in", False):
     user_id = st.session_state.get("ID_USER")
-    # If cached data missing or belongs to a different user, (re)load it
-    if (
-        "bets_data_cached" not in st.session_state
-        or st.session_state.get("bets_data_user_id") != user_id
-    ):
-        try:
-            st.session_state["bets_data_cached"] = prepare_bets_data(
-                user_id, finished=True
-            )
-            st.session_state["bets_data_user_id"] = user_id
-        except Exception:
-            st.session_state["bets_data_cached"] = pd.DataFrame()
+    if st.sidebar.button("🔄 Actualiser les paris"):
+        invalidate_user(user_id, "all_bets")
+    try:
+        bets_data = get_bets(user_id)
+    except Exception:
+        bets_data = pd.DataFrame()
 
 # For example, display user-specific data if logged in
 if st.session_state.get("logged_in", False):
-    # Use cached data if available (loaded once per user above)
-    bets_data = st.session_state.get("bets_data_cached", pd.DataFrame())
-
     # --- Sidebar filters: competition, cote range, date range ---
     try:
         bets_original = bets_data.copy()
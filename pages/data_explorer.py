@@ -1,7 +1,6 @@
 import streamlit as st
-import pandas as pd
 import pygwalker as pyg
-from data import prepare_bets_data
+from data_access import get_all_bets, get_bets, get_inplay_bets
 
 st.set_page_config(
     layout="wide",
@@ -72,21 +71,16 @@ data_source = st.sidebar.radio(
 )
 
 
-# Charger les données selon la sélection
-@st.cache_data(ttl=300)
+# Charger les données selon la sélection (via le cache partagé de data_access)
 def load_explorer_data(user_id, source):
     """Charge les données pour l'explorateur"""
     if source == "Paris terminés":
-        df = prepare_bets_data(user_id, finished=True)
+        df = get_bets(user_id)
     elif source == "Paris en cours":
-        df = prepare_bets_data(user_id, finished=False)
+        df = get_inplay_bets(user_id)
     else:  # Les deux
-        df_finished = prepare_bets_data(user_id, finished=True)
-        df_ongoing = prepare_bets_data(user_id, finished=False)
-        # Ajouter une colonne pour distinguer
-        df_finished["Statut"] = "Terminé"
-        df_ongoing["Statut"] = "En cours"
-        df = pd.concat([df_finished, df_ongoing], ignore_index=True)
+        # une seule requête pour les paris terminés et en cours (colonne Statut)
+        df = get_all_bets(user_id)
 
     return df
 
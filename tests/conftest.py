@@ -0,0 +1,49 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+import streamlit as st
+from streamlit import config
+
+# data.py and db_utils read the project path from the session state, as set
+# by app.py
+project_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + "/"
+st.session_state["project_path"] = project_path
+sys.path.append(project_path)
+
+# db_utils.globals reads db_url from st.secrets on import: the tests use their
+# own secrets file, pointing at a scratch SQLite directory, instead of the
+# developer's ~/.streamlit/secrets.toml
+scratch_dir = tempfile.mkdtemp(prefix="tennet_tests_")
+secrets_path = os.path.join(scratch_dir, "secrets.toml")
+with open(secrets_path, "w", encoding="utf-8") as f:
+    f.write(f'db_url = "sqlite:///{scratch_dir}/"\n')
+config.set_option("secrets.files", [secrets_path])
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def local_db() -> str:
+    """
+    Scratch database of db_url filled with generated tables (two users, a few
+    hundred matches ending on 2026-06-01, some of them still in play).
+    """
+    from db_utils import db_utils, local_backend
+
+    frames = local_backend.generate(
+        n_users=2,
+        years=0.05,
+        matches_per_year=4000,
+        bets_per_match=1,
+        future_days=2,
+        end="2026-06-01",
+    )
+    local_backend.write_database(scratch_dir, frames)
+    # engines opened before the files were written would not see them
+    db_utils.get_engine.clear()
+    return scratch_dir
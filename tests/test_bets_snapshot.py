@@ -0,0 +1,96 @@
+"""
+Incremental bets snapshot (data.refresh_all_bets) against a full rebuild
+(data.prepare_all_bets) while matches get settled on the local backend.
+"""
+
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import data
+
+USER_ID = 1
+
+
+@pytest.fixture
+def snapshots(local_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(data, "SNAPSHOT_DIR", str(tmp_path))
+    data.drop_bets_snapshot(USER_ID)
+    con = sqlite3.connect(os.path.join(local_db, "TeNNet"))
+    yield con
+    con.close()
+    data.drop_bets_snapshot(USER_ID)
+
+
+def _inplay_bets(con) -> list:
+    return con.execute(
+        """SELECT b.ID_BET, b.ID_MATCH FROM Bet b join men_matchs m
+                on (b.ID_MATCH = m.ID_MATCH)
+            WHERE b.ID_USER = ? and m.match_settled = 0 ORDER BY b.ID_BET""",
+        (USER_ID,),
+    ).fetchall()
+
+
+def _assert_matches_rebuild():
+    for incremental, full in zip(
+        data.split_bets(data.refresh_all_bets(USER_ID)),
+        data.split_bets(data.prepare_all_bets(USER_ID)),
+    ):
+        pd.testing.assert_frame_equal(
+            incremental.reset_index(drop=True),
+            full.reset_index(drop=True),
+            check_dtype=False,
+            check_categorical=False,
+        )
+
+
+def _pending_ids() -> list:
+    return data._bets_snapshots()["users"].get(USER_ID)["pending_ids"]
+
+
+def _set_match(con, match_id, match_settled, score):
+    con.execute(
+        "UPDATE men_matchs SET match_settled = ?, score = ? WHERE ID_MATCH = ?",
+        (match_settled, score, match_id),
+    )
+    con.commit()
+
+
+def test_bet_settled_before_its_score(snapshots):
+    con = snapshots
+    _assert_matches_rebuild()
+    bet_id, match_id = _inplay_bets(con)[0]
+    assert bet_id in _pending_ids()
+
+    # settled first, the score lands on a later write: the bet matches
+    # neither the settled nor the in-play filter meanwhile
+    _set_match(con, match_id, 1, None)
+    _assert_matches_rebuild()
+    assert bet_id in _pending_ids()
+
+    _set_match(con, match_id, 1, "6-4 7-6(3)")
+    _assert_matches_rebuild()
+    assert bet_id not in _pending_ids()
+    grouped = data._bets_snapshots()["users"].get(USER_ID)["prepared"]
+    assert bet_id in set(grouped["ID_BET"])
+
+
+def test_walkover_leaves_the_pending_bets(snapshots):
+    con = snapshots
+    _assert_matches_rebuild()
+    bet_id, match_id = _inplay_bets(con)[0]
+
+    _set_match(con, match_id, 2, "W/O")
+    _assert_matches_rebuild()
+    assert bet_id not in _pending_ids()
+
+
+def test_snapshot_is_bound_to_its_database(snapshots, monkeypatch):
+    _assert_matches_rebuild()
+    date_from = data.BETS_START_DATE
+    assert data._load_snapshot(USER_ID, date_from) is not None
+
+    monkeypatch.setattr(data.db_utils, "DB_URL", "mysql+pymysql://prod@db/")
+    assert data._load_snapshot(USER_ID, date_from) is None
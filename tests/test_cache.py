@@ -0,0 +1,60 @@
+import threading
+import time
+
+import pytest
+
+from db_utils.cache import LRUCache
+
+
+def test_failing_loader_leaves_no_key_lock():
+    cache = LRUCache(max_bytes=1024**2)
+
+    def loader():
+        raise RuntimeError("database down")
+
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            cache.get_or_set("key", loader)
+    assert cache._key_locks == {}
+    assert cache.get_or_set("key", lambda: 1) == 1
+    assert cache._key_locks == {}
+
+
+def test_concurrent_misses_load_one_at_a_time():
+    cache = LRUCache(max_bytes=1024**2)
+    state = {"running": 0, "max_running": 0, "calls": 0}
+    lock = threading.Lock()
+
+    def loader():
+        with lock:
+            state["calls"] += 1
+            state["running"] += 1
+            state["max_running"] = max(state["max_running"], state["running"])
+            failing = state["calls"] == 1
+        time.sleep(0.05)
+        with lock:
+            state["running"] -= 1
+        if failing:
+            # waiters retry the load after a failure, still one at a time
+            raise RuntimeError("first load fails")
+        return "value"
+
+    results = []
+
+    def read():
+        try:
+            results.append(cache.get_or_set("key", loader))
+        except RuntimeError:
+            results.append(None)
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.005)
+    for thread in threads:
+        thread.join()
+
+    assert state["max_running"] == 1
+    assert state["calls"] == 2
+    assert results.count("value") == 7
+    assert cache._key_locks == {}
@@ -0,0 +1,35 @@
+import pandas as pd
+
+import data
+from db_utils.db_utils import compact_frame
+
+
+def test_money_columns_stay_float64():
+    # every value is exact in float32, which the generic downcast would use
+    bets = pd.DataFrame(
+        {
+            "stake": [10.0, 2.5, 100.0],
+            "odds": [1.5, 2.25, 3.0],
+            "winner_pred": [1.5, 2.0, 4.0],
+            "loser_pred": [2.5, 1.75, 1.25],
+            "ID_BET": [1, 2, 3],
+            "surface": ["Clay", "Hard", "Clay"],
+        }
+    )
+    bets = compact_frame(bets, data.BETS_DTYPES)
+    for col in ["stake", "odds", "winner_pred", "loser_pred"]:
+        assert bets[col].dtype == "float64"
+    assert bets["ID_BET"].dtype == "int8"
+    assert bets["surface"].dtype == "category"
+
+    future = compact_frame(
+        pd.DataFrame({"max_odds1": [2.5, 1.5], "max_odds2": [1.75, 3.0]}),
+        data.FUTURE_MATCHS_DTYPES,
+    )
+    assert (future.dtypes == "float64").all()
+
+
+def test_other_floats_are_downcast_when_lossless():
+    frame = compact_frame(pd.DataFrame({"a": [1.5, 2.25], "b": [0.1, 0.2]}), {})
+    assert frame["a"].dtype == "float32"
+    assert frame["b"].dtype == "float64"
@@ -0,0 +1,141 @@
+"""
+Parity of data.compute_opportunities with the per-row loop of
+pages/future_matchs.py it replaced.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data
+from db_utils.db_utils import compact_frame
+
+PRICE_COLUMNS = ["Prédiction", "Max_cote", "EV_pct"]
+
+
+def reference_opportunities(df, min_marge=2, min_pred=1.1, max_pred=4) -> pd.DataFrame:
+    df = df.copy()
+    df["tourney_name"] = df["tourney_name"].astype(str)
+    df["compet"] = df["compet"].astype(str).str.title()
+    df["tourney_date"] = pd.to_datetime(df["tourney_date"], errors="coerce")
+    rows = []
+    for _, r in df.iterrows():
+        match_label = f"{r.get('winner_name', '')} - {r.get('loser_name', '')}"
+        for name, pred_col, odds_col in (
+            ("winner_name", "winner_pred", "max_odds1"),
+            ("loser_name", "loser_pred", "max_odds2"),
+        ):
+            try:
+                pred = float(r.get(pred_col) or 0)
+            except Exception:  # noqa: BLE001 - verbatim reference
+                pred = 0.0
+            try:
+                max_odds = float(r.get(odds_col) or 0)
+            except Exception:  # noqa: BLE001 - verbatim reference
+                max_odds = 0.0
+            ev = (max_odds / pred - 1) * 100 if (max_odds and pred) else 0.0
+            betable = ev > min_marge and (min_pred <= pred <= max_pred)
+            rows.append(
+                {
+                    "ID_MATCH": r.get("ID_MATCH"),
+                    "Match": match_label,
+                    "Joueur": r.get(name, ""),
+                    "Prédiction": pred,
+                    "Max_cote": max_odds,
+                    "EV_pct": ev,
+                    "Parier ?": betable,
+                    "Lien": r.get("odds_lien", ""),
+                    "Tournoi": r.get("tourney_name", ""),
+                    "Compétition": (r.get("compet") or "").title(),
+                    "Date": r.get("tourney_date"),
+                }
+            )
+    out = pd.DataFrame(rows)
+    out["Prédiction"] = out["Prédiction"].round(3)
+    out["Max_cote"] = out["Max_cote"].round(3)
+    out["EV_pct"] = out["EV_pct"].round(1)
+    return out.sort_values(by=["Date", "Match"], ascending=[True, True]).reset_index(
+        drop=True
+    )
+
+
+def future_matchs(n: int = 2000, seed: int = 0) -> pd.DataFrame:
+    """
+    Frame shaped like the load_future_matchs result.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2026-06-01") + pd.to_timedelta(
+        rng.integers(0, 7 * 24 * 4, n) * 15, unit="min"
+    )
+    frame = pd.DataFrame(
+        {
+            "tourney_name": rng.choice(["Roland Garros", "Lyon", "Rome"], n),
+            "tourney_level": rng.choice(["G", "A", "M"], n),
+            "winner_name": [f"Player {i}" for i in rng.integers(0, 300, n)],
+            "loser_name": [f"Player {i}" for i in rng.integers(300, 600, n)],
+            "round": rng.choice(["R32", "QF", "F"], n),
+            "surface": rng.choice(["Clay", "Hard"], n),
+            "tourney_date": dates.astype(str),
+            "compet": rng.choice(["atp", "wta", "double atp"], n),
+            "ID_MATCH": [f"m{i}" for i in range(n)],
+            "winner_pred": rng.uniform(1.01, 6, n).round(3),
+            "loser_pred": rng.uniform(1.01, 6, n).round(3),
+            "max_odds1": rng.uniform(1.01, 6, n).round(2),
+            "max_odds2": rng.uniform(1.01, 6, n).round(2),
+            "odds_lien": np.where(
+                rng.random(n) < 0.5, None, [f"https://odds/{i}" for i in range(n)]
+            ),
+        }
+    )
+    # same start time and same match label: the sort must keep the input order
+    frame.loc[:49, "tourney_date"] = frame.loc[0, "tourney_date"]
+    frame.loc[10:19, ["winner_name", "loser_name"]] = ["Player 1", "Player 2"]
+    # no odds yet for a side
+    frame.loc[60:69, "max_odds1"] = 0.0
+    return data._sort_by_date(compact_frame(frame, data.FUTURE_MATCHS_DTYPES))
+
+
+def test_matches_reference_loop():
+    df = future_matchs()
+    pd.testing.assert_frame_equal(
+        data.compute_opportunities(df), reference_opportunities(df), check_dtype=False
+    )
+
+
+@pytest.mark.parametrize("thresholds", [(0, 1.0, 10), (5, 1.5, 2.5)])
+def test_matches_reference_loop_thresholds(thresholds):
+    df = future_matchs(500, seed=1)
+    pd.testing.assert_frame_equal(
+        data.compute_opportunities(df, *thresholds),
+        reference_opportunities(df, *thresholds),
+        check_dtype=False,
+    )
+
+
+def test_missing_prices_count_as_zero():
+    # the loop let NaN through (NaN is truthy): missing predictions and odds
+    # gave NaN prices and EV, they are now 0 and the side is never betable
+    df = future_matchs(500, seed=2)
+    df.loc[df.index[:20], "winner_pred"] = np.nan
+    df.loc[df.index[20:40], "max_odds2"] = np.nan
+    df.loc[df.index[40:45], ["loser_pred", "max_odds1"]] = np.nan
+
+    result = data.compute_opportunities(df)
+    reference = reference_opportunities(df)
+
+    missing = reference[PRICE_COLUMNS].isna().any(axis=1)
+    assert missing.sum() == 50
+    assert not result[PRICE_COLUMNS].isna().any().any()
+    assert (result.loc[missing, "EV_pct"] == 0).all()
+    assert not result.loc[missing, "Parier ?"].any()
+    pd.testing.assert_frame_equal(
+        result,
+        reference.fillna({column: 0.0 for column in PRICE_COLUMNS}),
+        check_dtype=False,
+    )
+
+
+def test_empty_frame():
+    result = data.compute_opportunities(future_matchs().iloc[:0])
+    assert result.empty
+    assert result.columns.tolist() == data.OPPORTUNITY_COLUMNS
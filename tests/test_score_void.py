@@ -0,0 +1,138 @@
+"""
+Parity of data._score_is_void / data.scores_void_mask with the per-row check
+they replaced (the nested _score_is_void of _prepare_bets, applied with
+Series.apply).
+"""
+
+import random
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data
+from db_utils import local_backend
+
+set_re = re.compile(r"^(?P<a>\d+)-(?P<b>\d+)(?:\(\d+\))?$")
+
+
+def reference_score_is_void(score):
+    try:
+        if not isinstance(score, str) or score.strip() == "":
+            return True
+        raw_tokens = score.strip().split()
+        tokens_upper = [t.upper().strip(".,") for t in raw_tokens]
+        retire_markers = (
+            "RET",
+            "RETIRE",
+            "RETIREE",
+            "RET.",
+            "ABD",
+            "ABANDON",
+            "RETIREMENT",
+        )
+        is_retirement = any(
+            any(marker in t for marker in retire_markers) for t in tokens_upper
+        )
+        set_tokens = [t.rstrip(",") for t in raw_tokens if re.search(r"\d+-\d+", t)]
+        if not set_tokens:
+            return not is_retirement
+
+        def _set_completed(t):
+            m = set_re.match(t)
+            if not m:
+                return False
+            a = int(m.group("a"))
+            b = int(m.group("b"))
+            return a >= 6 or b >= 6 or "(" in t
+
+        if is_retirement:
+            return not any(_set_completed(t) for t in set_tokens)
+        for t in set_tokens:
+            if not _set_completed(t):
+                return True
+        return False
+    except Exception:  # noqa: BLE001 - verbatim reference
+        return True
+
+
+# (score, voided) as stored in the match tables
+SCORES = [
+    ("6-4 6-3", False),
+    ("4-6 6-3 7-6(3)", False),
+    ("7-6(5) 6-4", False),
+    ("7-6(10) 3-6 7-6(8)", False),
+    ("6-3 6-7(4) 6-2", False),
+    ("3-6 6-7(4)", False),
+    ("6-4 2-6 10-8", False),
+    ("6-4 2-6 [10-8]", True),
+    ("7-6 6-4", False),
+    ("7-6(7-5) 6-4", True),
+    ("6-4, 6-3", False),
+    ("6-4,6-3", True),
+    ("6-4 5-3", True),
+    ("1-0", True),
+    ("6-4 3-2 RET", False),
+    ("6-4 3-2 ret.", False),
+    ("6-4 6-3 ret", False),
+    ("6-0 Retired", False),
+    ("7-6(5), 2-0 RET,", False),
+    ("3-2 RET", True),
+    ("0-0 RET", True),
+    ("RET", False),
+    ("6-2 2-1 ABD", False),
+    ("5-7 Abandon", False),
+    ("2-1 ABD", True),
+    ("ABD", False),
+    ("7-5 4-4 Def.", True),
+    ("W/O", True),
+    ("w/o", True),
+    ("6-1 Walkover", False),
+    ("6–4 6–3", True),
+    ("x-y", True),
+    ("", True),
+    ("   ", True),
+    (None, True),
+    (np.nan, True),
+    (12, True),
+]
+
+
+@pytest.mark.parametrize("score, voided", SCORES)
+def test_score_is_void(score, voided):
+    assert reference_score_is_void(score) is voided
+    assert data._score_is_void(score) is voided
+
+
+def _generated_scores(n: int = 5000) -> list:
+    rnd = random.Random(0)
+    return [local_backend._match_score(rnd, rnd.choice((3, 5))) for _ in range(n)]
+
+
+def test_generated_scores_match_reference():
+    scores = _generated_scores()
+    assert [data._score_is_void(s) for s in scores] == [
+        reference_score_is_void(s) for s in scores
+    ]
+
+
+@pytest.mark.parametrize("dtype", [object, "category"])
+def test_scores_void_mask_matches_apply(dtype):
+    rnd = random.Random(1)
+    corpus = [score for score, _ in SCORES] + _generated_scores(500)
+    scores = pd.Series(
+        [rnd.choice(corpus) for _ in range(20_000)],
+        index=pd.RangeIndex(5, 20_005),
+        name="Score",
+        dtype=object,
+    )
+    if dtype == "category":
+        # categories cannot mix types: keep the strings and missing values
+        scores = scores.where(scores.map(lambda s: isinstance(s, str))).astype(dtype)
+    data._score_is_void.cache_clear()
+
+    mask = data.scores_void_mask(scores)
+
+    expected = scores.astype(object).apply(reference_score_is_void).astype(bool)
+    pd.testing.assert_series_equal(mask, expected)